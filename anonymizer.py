@@ -7,11 +7,62 @@ identifiable information (PII) is stored or transmitted.
 GDPR/CCPA Compliant Data Processing
 """
 
-import hashlib
 import json
-from typing import Dict, List, Any
+import secrets
+import time
+import numpy as np
+from collections import deque
+from operator import methodcaller
+from typing import Dict, List, Any, Union
 from datetime import datetime
 import config
+from emotion_batch import EmotionBatch
+
+try:
+    from numba import guvectorize, float32, float64
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @guvectorize(
+        [(float32[:, :], float64[:])],
+        '(n,k)->(k)',
+        nopython=True,
+        target='cpu',
+        cache=True
+    )
+    def _agg_emotions(scores, out):
+        """Per-emotion mean across faces, rounded to 2 decimals."""
+        n, k = scores.shape
+        for j in range(k):
+            total = 0.0
+            for i in range(n):
+                total += scores[i, j]
+            out[j] = round(total / n, 2)
+else:
+    def _agg_emotions(scores):
+        """Per-emotion mean across faces, rounded to 2 decimals."""
+        return np.round(scores.mean(axis=0, dtype=np.float64), 2)
+
+
+# Coarse wall-clock cache: [monotonic seconds, ISO string], refreshed every 100 ms
+_last_ts = [float('-inf'), '']
+
+
+def _coarse_isoformat() -> str:
+    """Return an ISO timestamp at most 100 ms stale, formatting only on refresh."""
+    now = time.monotonic()
+    if now - _last_ts[0] > 0.1:
+        _last_ts[0] = now
+        _last_ts[1] = datetime.now().isoformat()
+    return _last_ts[1]
+
+
+class _AnonDict(dict):
+    """Marker type for aggregates built by DataAnonymizer (PII-free when built, still validated)."""
+    __slots__ = ()
 
 
 class DataAnonymizer:
@@ -26,6 +77,26 @@ class DataAnonymizer:
     5. No demographic inference or tracking
     """
 
+    # Per-frame events, only logged when config.PRIVACY_LOG_HOT_EVENTS is set
+    HOT_EVENTS = frozenset(['data_anonymized', 'privacy_validation'])
+
+    # Forbidden keys that would indicate PII
+    FORBIDDEN_KEYS = frozenset([
+        'face_image',
+        'face_embedding',
+        'face_id',
+        'person_id',
+        'facial_landmarks',
+        'bounding_box',
+        'video_frame',
+        'name',
+        'identity',
+        'demographics',
+        'age',
+        'gender',
+        'race'
+    ])
+
     def __init__(self, session_id: str = None):
         """
         Initialize anonymizer with unique session ID.
@@ -35,17 +106,16 @@ class DataAnonymizer:
         """
         self.session_id = session_id or self._generate_session_id()
         self.data_processed_count = 0
-        self.privacy_log = []
+        self.privacy_log = deque(maxlen=config.PRIVACY_LOG_MAXLEN)
+        self._log_hot = config.PRIVACY_LOG_HOT_EVENTS
 
     def _generate_session_id(self) -> str:
         """Generate anonymous session identifier."""
-        timestamp = datetime.now().isoformat()
-        hash_input = f"{timestamp}_shock_score".encode()
-        return hashlib.sha256(hash_input).hexdigest()[:16]
+        return secrets.token_hex(8)
 
     def anonymize_emotion_data(
         self,
-        emotion_results: List[Dict],
+        emotion_results: Union[EmotionBatch, List[Dict]],
         timestamp: float
     ) -> Dict:
         """
@@ -55,31 +125,22 @@ class DataAnonymizer:
         aggregated into population-level statistics.
 
         Args:
-            emotion_results: List of emotion dicts from EmotionAnalyzer
+            emotion_results: EmotionBatch from EmotionAnalyzer.analyze_batch
+                (a legacy list of emotion dicts is also accepted)
             timestamp: Frame timestamp
 
         Returns:
             Anonymized aggregate data (safe for transmission/storage)
         """
-        # Filter out None results
-        valid_results = [r for r in emotion_results if r is not None]
+        batch = EmotionBatch.coerce(emotion_results)
 
-        if not valid_results:
+        if len(batch) == 0:
             return self._get_empty_aggregate(timestamp)
 
-        # Aggregate emotion scores across all faces
-        emotion_totals = {emotion: 0.0 for emotion in config.EMOTION_LABELS}
-
-        for result in valid_results:
-            for emotion, score in result['emotion_scores'].items():
-                emotion_totals[emotion] += score
-
         # Calculate averages (this destroys individual identity)
-        face_count = len(valid_results)
-        emotion_averages = {
-            emotion: round(total / face_count, 2)
-            for emotion, total in emotion_totals.items()
-        }
+        face_count = batch.scores.shape[0]
+        means = _agg_emotions(batch.scores)
+        emotion_averages = dict(zip(config.EMOTION_LABELS, means.tolist()))
 
         self.data_processed_count += face_count
 
@@ -90,14 +151,14 @@ class DataAnonymizer:
             timestamp
         )
 
-        return {
+        return _AnonDict({
             'session_id': self.session_id,
             'timestamp': round(timestamp, 2),
             'audience_size': face_count,
             'emotions': emotion_averages,
             'privacy_level': 'anonymized',
             'contains_pii': False
-        }
+        })
 
     def validate_privacy_compliance(self, data: Dict) -> bool:
         """
@@ -109,38 +170,26 @@ class DataAnonymizer:
         Returns:
             True if privacy-compliant, False otherwise
         """
-        # Forbidden keys that would indicate PII
-        forbidden_keys = [
-            'face_image',
-            'face_embedding',
-            'face_id',
-            'person_id',
-            'facial_landmarks',
-            'bounding_box',
-            'video_frame',
-            'name',
-            'identity',
-            'demographics',
-            'age',
-            'gender',
-            'race'
-        ]
-
-        # Recursively check for forbidden keys
-        def check_dict(d):
-            if isinstance(d, dict):
-                for key in d.keys():
-                    if key in forbidden_keys:
-                        return False
-                    if not check_dict(d[key]):
-                        return False
-            elif isinstance(d, list):
-                for item in d:
-                    if not check_dict(item):
-                        return False
-            return True
-
-        compliant = check_dict(data)
+        compliant = True
+        stack = [data]
+        if isinstance(data, _AnonDict):
+            # Built PII-free but still mutable: check the top level, then
+            # only descend into containers (the emotions dict or anything
+            # added since) instead of every scalar value
+            if not self.FORBIDDEN_KEYS.isdisjoint(data):
+                compliant = False
+            stack = [v for v in data.values() if isinstance(v, (dict, list))]
+
+        # Iterative walk; stops at the first dict holding a forbidden key
+        while compliant and stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                if not self.FORBIDDEN_KEYS.isdisjoint(node):
+                    compliant = False
+                    break
+                stack.extend(node.values())
+            elif isinstance(node, list):
+                stack.extend(node)
 
         self._log_privacy_event(
             'privacy_validation',
@@ -157,24 +206,38 @@ class DataAnonymizer:
             event_type: Type of privacy event
             *args, **kwargs: Event details
         """
+        if event_type in self.HOT_EVENTS and not self._log_hot:
+            return
+
+        # Coarse wall-clock string plus a precise monotonic tick for ordering
         event = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': _coarse_isoformat(),
+            'monotonic_ns': time.monotonic_ns(),
             'session_id': self.session_id,
             'event_type': event_type,
             'details': {'args': args, 'kwargs': kwargs}
         }
         self.privacy_log.append(event)
 
+    def get_privacy_log(self) -> List[Dict]:
+        """
+        Export the audit trail.
+
+        Returns:
+            List of privacy events (oldest first)
+        """
+        return list(self.privacy_log)
+
     def _get_empty_aggregate(self, timestamp: float) -> Dict:
         """Return empty anonymized data structure."""
-        return {
+        return _AnonDict({
             'session_id': self.session_id,
             'timestamp': round(timestamp, 2),
             'audience_size': 0,
-            'emotions': {emotion: 0.0 for emotion in config.EMOTION_LABELS},
+            'emotions': config.EMPTY_EMOTION_DICT.copy(),
             'privacy_level': 'anonymized',
             'contains_pii': False
-        }
+        })
 
     def generate_privacy_report(self) -> Dict:
         """
@@ -206,6 +269,8 @@ class SecureTransmission:
     Ensures secure transmission of anonymized data to cloud API.
     """
 
+    ANONYMIZED_LEVELS = frozenset(['anonymized'])
+
     def __init__(self, api_endpoint: str = None):
         """
         Initialize secure transmission handler.
@@ -265,12 +330,13 @@ class SecureTransmission:
         if payload.get('data_type') != 'anonymized_aggregate':
             return False
 
-        # Validate all metrics are anonymized
-        for metric in payload.get('metrics', []):
-            if not metric.get('privacy_level') == 'anonymized':
-                return False
+        # Validate all metrics are anonymized (map/set run in C, no per-item frames)
+        privacy_levels = set(map(
+            methodcaller('get', 'privacy_level'),
+            payload.get('metrics', [])
+        ))
 
-        return True
+        return privacy_levels <= self.ANONYMIZED_LEVELS
 
 
 if __name__ == "__main__":
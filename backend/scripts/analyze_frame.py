@@ -4,14 +4,31 @@ Real-Time Frame Analysis Script
 
 Analyzes a single image frame for facial emotions.
 Used by the webcam feature for live Shock Score detection.
+
+Usage:
+    analyze_frame.py IMAGE_PATH        Analyze one frame and exit
+    analyze_frame.py --worker          Read newline-delimited image paths on
+                                       stdin, emit one JSON result per line
+    analyze_frame.py --raw WxH         Read raw BGR frames (W*H*3 bytes each)
+                                       from stdin, emit one JSON result per
+                                       frame (no JPEG encode/decode, no disk)
 """
 
 import sys
 import json
+import contextlib
 import cv2
 import numpy as np
 from pathlib import Path
 
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    _dumps = json.dumps
+
 # Add parent directory to path to import our modules
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
@@ -19,13 +36,31 @@ try:
     from emotion_analyzer import EmotionAnalyzer
     from face_detector import CinemaFaceDetector
 except ImportError as e:
-    print(json.dumps({
+    print(_dumps({
         "error": f"Failed to import modules: {e}",
         "faceDetected": False
     }))
     sys.exit(1)
 
 
+# Models are loaded once per process and reused across frames
+_PIPELINE = None
+
+
+def _get_pipeline():
+    """
+    Return the cached (face_detector, emotion_analyzer) pair.
+
+    Both wrap heavy DL models, so they are built on first use only.
+    """
+    global _PIPELINE
+    if _PIPELINE is None:
+        # Model warm-up chatter goes to stderr so stdout stays pure JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            _PIPELINE = (CinemaFaceDetector(detect_every_n=1), EmotionAnalyzer())
+    return _PIPELINE
+
+
 def analyze_frame(image_path):
     """
     Analyze a single frame for emotions.
@@ -36,18 +71,28 @@ def analyze_frame(image_path):
     Returns:
         dict: Analysis results
     """
-    try:
-        # Load image
-        frame = cv2.imread(image_path)
-        if frame is None:
-            return {
-                "faceDetected": False,
-                "error": "Could not read image"
-            }
+    frame = cv2.imread(image_path)
+    if frame is None:
+        return {
+            "faceDetected": False,
+            "error": "Could not read image"
+        }
+
+    return analyze_image(frame)
+
+
+def analyze_image(frame):
+    """
+    Analyze an already-decoded frame for emotions.
 
-        # Initialize components
-        face_detector = CinemaFaceDetector()
-        emotion_analyzer = EmotionAnalyzer()
+    Args:
+        frame: BGR image (numpy array, HxWx3 uint8)
+
+    Returns:
+        dict: Analysis results
+    """
+    try:
+        face_detector, emotion_analyzer = _get_pipeline()
 
         # Detect faces
         detections = face_detector.detect_faces(frame)
@@ -58,8 +103,9 @@ def analyze_frame(image_path):
                 "message": "No face detected"
             }
 
-        # Use the first (most prominent) face
-        face_regions = face_detector.extract_face_regions(frame, [detections[0]])
+        # Use the most confident face
+        best = int(detections.scores.argmax())
+        face_regions = face_detector.extract_face_regions(frame, detections[best])
 
         if not face_regions:
             return {
@@ -90,14 +136,65 @@ def analyze_frame(image_path):
         }
 
 
+def run_worker():
+    """Serve frames from stdin until EOF, keeping models warm."""
+    for line in sys.stdin:
+        image_path = line.strip()
+        if not image_path:
+            continue
+        print(_dumps(analyze_frame(image_path)), flush=True)
+
+
+def run_raw_worker(width, height):
+    """
+    Serve raw BGR frames from stdin until EOF.
+
+    Each frame is exactly width*height*3 bytes, wrapped without copying.
+    """
+    frame_bytes = width * height * 3
+    stream = sys.stdin.buffer
+    while True:
+        buf = stream.read(frame_bytes)
+        if len(buf) < frame_bytes:
+            break
+        frame = np.frombuffer(buf, dtype=np.uint8).reshape(height, width, 3)
+        print(_dumps(analyze_image(frame)), flush=True)
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print(json.dumps({
+        print(_dumps({
             "error": "No image path provided",
             "faceDetected": False
         }))
         sys.exit(1)
 
+    # Load weights and init the GPU allocator before the first frame
+    try:
+        _get_pipeline()
+    except Exception as e:
+        print(_dumps({
+            "error": f"Failed to load models: {e}",
+            "faceDetected": False
+        }))
+        sys.exit(1)
+
+    if sys.argv[1] == "--worker":
+        run_worker()
+        sys.exit(0)
+
+    if sys.argv[1] == "--raw":
+        try:
+            width, height = (int(v) for v in sys.argv[2].lower().split("x"))
+        except (IndexError, ValueError):
+            print(_dumps({
+                "error": "Expected --raw WIDTHxHEIGHT",
+                "faceDetected": False
+            }))
+            sys.exit(1)
+        run_raw_worker(width, height)
+        sys.exit(0)
+
     image_path = sys.argv[1]
     result = analyze_frame(image_path)
-    print(json.dumps(result))
+    print(_dumps(result))
@@ -4,6 +4,9 @@ Shock Score System Configuration
 Cinema-optimized settings for facial emotion recognition in low-light environments.
 """
 
+import os
+import numpy as np
+
 # Video Processing Settings
 FRAME_RATE = 30  # Target FPS for processing
 FRAME_SKIP = 2   # Process every Nth frame (15 FPS effective rate for performance)
@@ -14,6 +17,8 @@ FRAME_HEIGHT = 480
 MIN_FACE_SIZE = 40  # Minimum face size in pixels (cinema audiences may be far from camera)
 DETECTION_CONFIDENCE = 0.7  # Threshold for face detection (lower for challenging IR conditions)
 MAX_FACES_PER_FRAME = 50  # Maximum audience members to track per frame
+DETECT_EVERY_N_FRAMES = 5  # Full face detection every N frames, IoU-tracked in between (1 = every frame)
+TRACK_CONFIDENCE_DECAY = 0.97  # Per-frame confidence decay for tracked (not re-detected) faces
 
 # Emotion Recognition Settings
 EMOTION_LABELS = [
@@ -25,6 +30,8 @@ EMOTION_LABELS = [
     'surprise',
     'neutral'
 ]
+EMOTION_INDEX = {emotion: i for i, emotion in enumerate(EMOTION_LABELS)}
+EMPTY_EMOTION_DICT = {emotion: 0.0 for emotion in EMOTION_LABELS}  # copy() before use
 
 # Shock Score Calculation Parameters
 FEAR_WEIGHT = 2.0      # Fear has highest impact on Shock Score
@@ -35,18 +42,44 @@ ANGRY_WEIGHT = 0.2     # Negative but not target emotion
 SAD_WEIGHT = 0.1       # Low impact
 NEUTRAL_WEIGHT = 0.0   # No emotional engagement
 
+# Per-emotion weights aligned with EMOTION_LABELS (for vectorized dot products)
+WEIGHTS = np.array([
+    ANGRY_WEIGHT,
+    DISGUST_WEIGHT,
+    FEAR_WEIGHT,
+    HAPPY_WEIGHT,
+    SAD_WEIGHT,
+    SURPRISE_WEIGHT,
+    NEUTRAL_WEIGHT
+], dtype=np.float32)
+assert len(WEIGHTS) == len(EMOTION_LABELS)
+
 # EPM (Emotional Performance Metric) Settings
 EPM_WINDOW_SECONDS = 5  # Calculate EPM over 5-second rolling windows
 BASELINE_CALIBRATION_SECONDS = 30  # Use first 30s to establish neutral baseline
+AUTO_SCARE_DETECTION = False  # Gap-based scare detection instead of a fixed 30-point spike
 
 # Privacy & Anonymization
 STORE_FRAMES = False  # NEVER store video frames
 STORE_FACE_EMBEDDINGS = False  # NEVER store facial feature vectors
 AGGREGATE_ONLY = True  # Only output aggregate emotional scores
+PRIVACY_LOG_MAXLEN = 1024  # Audit trail ring buffer size (oldest entries dropped)
+PRIVACY_LOG_HOT_EVENTS = False  # Also log per-frame anonymize/validate events (debug)
 
 # Performance Optimization
 USE_GPU = True  # Enable GPU acceleration if available
 BATCH_SIZE = 8  # Process multiple faces in batch for efficiency
+FRAME_BATCH_SIZE = 8  # Frames per batched emotion inference in the engine (1 = lowest display latency)
+EMOTION_CACHE_SIZE = 0  # In-memory LRU of recent per-face results (0 disables; approximate, opt-in)
+EMOTION_CACHE_TTL_MS = 500  # Reuse a cached face result for at most this long
+CPU_INFERENCE_THREADS = os.cpu_count() or 1  # Threads for the TFLite (INT8) emotion interpreter
+QUANTIZE_EMOTION_MODEL = True  # INT8-weight TFLite emotion model on CPU-only hosts (never with a GPU)
+QUANTIZATION_MAX_KL = 0.05  # Max mean KL(FP32 || INT8) before falling back to FP32
+QUANTIZATION_CALIBRATION_FACES = 32  # Real faces compared FP32 vs INT8 before switching
+MODEL_CACHE_DIR = os.path.expanduser('~/.cache/shockscore')  # Converted model cache
+YUNET_MODEL_PATH = os.path.join(  # Single-shot face detector (MTCNN used if missing)
+    MODEL_CACHE_DIR, 'face_detection_yunet_2023mar.onnx'
+)
 
 # Output Settings
 OUTPUT_FORMAT = 'json'  # Options: 'json', 'csv'
@@ -10,6 +10,11 @@ import numpy as np
 import json
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import Shock Score modules
 from shock_score_engine import ShockScoreEngine
 import config
@@ -144,8 +149,12 @@ def display_report_summary(report_path: str):
         report_path: Path to JSON report file
     """
     try:
-        with open(report_path, 'r') as f:
-            report = json.load(f)
+        if orjson is not None:
+            with open(report_path, 'rb') as f:
+                report = orjson.loads(f.read())
+        else:
+            with open(report_path, 'r') as f:
+                report = json.load(f)
 
         print("\n" + "="*60)
         print("SHOCK SCORE REPORT SUMMARY")
@@ -202,43 +211,58 @@ def generate_sample_video():
         (6, 10, "Relief / Resolution", (0, 255, 0))
     ]
 
+    # Render each scene's static text once
+    base_frames = []
+    for start, end, text, color in scenes:
+        base = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.putText(
+            base,
+            text,
+            (50, height // 2),
+            cv2.FONT_HERSHEY_DUPLEX,
+            1.5,
+            color,
+            3
+        )
+        base_frames.append((start, end, base))
+
+    blank_frame = np.zeros((height, width, 3), dtype=np.uint8)
+
+    # Timestamp label only changes every 0.1s, so consecutive frames
+    # with the same scene and label reuse the previously rendered frame
+    last_key = None
+    frame = blank_frame
+
     for frame_num in range(fps * duration):
         timestamp = frame_num / fps
 
-        # Create black frame
-        frame = np.zeros((height, width, 3), dtype=np.uint8)
-
         # Determine current scene
-        current_scene = None
-        for start, end, text, color in scenes:
+        base = None
+        for start, end, scene_frame in base_frames:
             if start <= timestamp < end:
-                current_scene = (text, color)
+                base = scene_frame
                 break
 
-        if current_scene:
-            text, color = current_scene
+        if base is None:
+            last_key = None
+            out.write(blank_frame)
+            continue
 
-            # Add text
-            cv2.putText(
-                frame,
-                text,
-                (50, height // 2),
-                cv2.FONT_HERSHEY_BOLD,
-                1.5,
-                color,
-                3
-            )
+        label = f"Time: {timestamp:.1f}s"
+        if (id(base), label) != last_key:
+            frame = base.copy()
 
             # Add timestamp
             cv2.putText(
                 frame,
-                f"Time: {timestamp:.1f}s",
+                label,
                 (50, height - 50),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.8,
                 (255, 255, 255),
                 2
             )
+            last_key = (id(base), label)
 
         out.write(frame)
 
@@ -5,14 +5,79 @@ Uses DeepFace for emotion classification optimized for cinema environments.
 Analyzes facial expressions to detect fear, surprise, and other emotions.
 """
 
+import os
+import time
+import hashlib
 import cv2
 import numpy as np
+from collections import OrderedDict
 from deepface import DeepFace
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import config
+from emotion_batch import EmotionBatch
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Pass-through decorator when numba is not installed."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _roll_window(running_sum, frame_sums, face_counts, timestamps, start, n, cutoff):
+    """
+    Add frame n-1 to the running window and expire frames older than cutoff.
+
+    Returns:
+        (new window start index, change in face count)
+    """
+    count_delta = face_counts[n - 1]
+    running_sum += frame_sums[n - 1]
+    while start < n and timestamps[start] < cutoff:
+        running_sum -= frame_sums[start]
+        count_delta -= face_counts[start]
+        start += 1
+    return start, count_delta
+
+
+# Shock score normalization: fear + surprise at 100% maps to 100
+_MAX_SHOCK = 100.0 * (config.FEAR_WEIGHT + config.SURPRISE_WEIGHT)
+_INV_NORM = 1.0 / _MAX_SHOCK
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _shock_scores(scores, weights, norm):
+        """
+        Weighted shock score for each row of an (N, 7) emotion score matrix.
+
+        Returns:
+            (N,) float32 scores clipped to 0-100
+        """
+        n, k = scores.shape
+        out = np.empty(n, dtype=np.float32)
+        scale = 100.0 / norm
+        for i in range(n):
+            total = 0.0
+            for j in range(k):
+                total += scores[i, j] * weights[j]
+            out[i] = min(total * scale, 100.0)
+        return out
+else:
+    def _shock_scores(scores, weights, norm):
+        """NumPy fallback when numba is not installed."""
+        out = (scores @ weights).astype(np.float32, copy=False)
+        np.minimum(out * (100.0 / norm), 100.0, out=out)
+        return out
+
 
 class EmotionAnalyzer:
     """
@@ -22,6 +87,9 @@ class EmotionAnalyzer:
     horror/thriller-relevant emotions (fear, surprise, disgust).
     """
 
+    # BGR -> luma weights used by cv2.COLOR_BGR2GRAY
+    _GRAY_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
     def __init__(self, model_name: str = 'Facenet', detector_backend: str = 'skip'):
         """
         Initialize emotion analyzer.
@@ -34,25 +102,280 @@ class EmotionAnalyzer:
         self.detector_backend = detector_backend
         self.analysis_count = 0
 
+        # Emotion CNN (48x48 grayscale -> 7-way softmax), called directly
+        self._model = None
+        self._predict = None
+        self.quantized = False
+
+        # INT8 model awaiting validation against FP32 on real face crops
+        self._int8_candidate = None
+        self._calibration = []
+        self._calibration_faces = 0
+
+        # Host buffers allocated once and reused for every frame
+        self._allocate_buffers(config.MAX_FACES_PER_FRAME)
+
+        # Recent results keyed by an opaque digest of the face thumbnail.
+        # Memory only, bounded and short-lived; never persisted.
+        self._cache = OrderedDict()
+
         # Warm up the model (load weights into memory)
         print("Warming up emotion recognition model...")
         self._warm_up_model()
         print("Model ready for real-time analysis")
 
     def _warm_up_model(self):
-        """Pre-load model weights by running a dummy prediction."""
+        """
+        Load the DeepFace emotion CNN once and run a dummy prediction.
+
+        The underlying Keras model is invoked directly by _infer(), which
+        bypasses the per-call detection/alignment/bookkeeping overhead of
+        DeepFace.analyze.
+        """
         try:
-            dummy_frame = np.zeros((48, 48, 3), dtype=np.uint8)
-            DeepFace.analyze(
-                dummy_frame,
-                actions=['emotion'],
-                detector_backend='skip',
-                enforce_detection=False,
-                silent=True
-            )
+            self._model = DeepFace.build_model('Emotion').model
+            self._predict = lambda batch: self._model(batch, training=False)
+
+            dummy_face = np.zeros((48, 48, 3), dtype=np.uint8)
+            self._infer(self._preprocess([dummy_face]))
+
+            # INT8 only pays off on CPU; a GPU keeps the Keras model
+            if config.QUANTIZE_EMOTION_MODEL and not self._gpu_visible():
+                self._load_quantized_model()
         except Exception as e:
             print(f"Model warm-up warning: {e}")
 
+    @staticmethod
+    def _gpu_visible() -> bool:
+        """Return True if GPU inference is enabled and TensorFlow sees a GPU."""
+        if not config.USE_GPU:
+            return False
+        try:
+            import tensorflow as tf
+            return bool(tf.config.list_physical_devices('GPU'))
+        except Exception:
+            return False
+
+    def _load_quantized_model(self):
+        """
+        Prepare an INT8-weight TFLite copy of the emotion CNN.
+
+        The converted model is cached under config.MODEL_CACHE_DIR. It is
+        only swapped in once its softmax output stays within
+        config.QUANTIZATION_MAX_KL (mean KL divergence) of the FP32 model on
+        the first config.QUANTIZATION_CALIBRATION_FACES real faces analyzed
+        (see _calibrate_int8); until then the FP32 model is used.
+        """
+        try:
+            import tensorflow as tf
+
+            model_path = os.path.join(
+                config.MODEL_CACHE_DIR,
+                f"emotion_int8_tf{tf.__version__}.tflite"
+            )
+            if not os.path.exists(model_path):
+                converter = tf.lite.TFLiteConverter.from_keras_model(self._model)
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                os.makedirs(config.MODEL_CACHE_DIR, exist_ok=True)
+                tmp_path = model_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(converter.convert())
+                os.replace(tmp_path, model_path)
+
+            interpreter = tf.lite.Interpreter(
+                model_path=model_path, num_threads=config.CPU_INFERENCE_THREADS
+            )
+            input_index = interpreter.get_input_details()[0]['index']
+            output_index = interpreter.get_output_details()[0]['index']
+            allocated_shape = [None]
+
+            def predict_int8(batch):
+                if batch.shape != allocated_shape[0]:
+                    interpreter.resize_tensor_input(input_index, batch.shape)
+                    interpreter.allocate_tensors()
+                    allocated_shape[0] = batch.shape
+                interpreter.set_tensor(input_index, batch)
+                interpreter.invoke()
+                return interpreter.get_tensor(output_index)
+
+            self._int8_candidate = predict_int8
+            self._calibration = []
+            self._calibration_faces = 0
+        except Exception as e:
+            print(f"INT8 quantization unavailable, using FP32: {e}")
+
+    def _preprocess(self, face_images: Union[List[np.ndarray], np.ndarray]) -> np.ndarray:
+        """
+        Convert BGR face crops to the emotion model's input tensor.
+
+        Args:
+            face_images: Cropped face regions (BGR), or an (N, 48, 48, 3)
+                uint8 batch already at model size (skips the resize)
+
+        Returns:
+            (N, 48, 48, 1) float32 grayscale batch scaled to [0, 1]
+            (a view into a reused buffer)
+        """
+        n = len(face_images)
+        if n > self._crop_buf.shape[0]:
+            self._allocate_buffers(n)
+
+        if isinstance(face_images, np.ndarray) and face_images.shape[1:] == (48, 48, 3):
+            crops = face_images
+        else:
+            # Resize each crop straight into its preallocated 48x48 slot
+            # (area filter when shrinking; plain copy when already 48x48).
+            # The result is assigned too: for non-uint8 or non-BGR input
+            # OpenCV allocates a new array instead of writing into dst.
+            crops = self._crop_buf[:n]
+            for i, face_image in enumerate(face_images):
+                h, w = face_image.shape[:2]
+                if h == 48 and w == 48:
+                    crops[i] = face_image
+                else:
+                    crops[i] = cv2.resize(
+                        face_image,
+                        (48, 48),
+                        dst=crops[i],
+                        interpolation=cv2.INTER_AREA if h > 48 else cv2.INTER_LINEAR
+                    )
+
+        # Grayscale + [0, 1] scaling fused into one dot over the small planes
+        gray = self._input_buf[:n]
+        np.dot(crops, self._GRAY_WEIGHTS * (1.0 / 255.0), out=gray)
+        return gray[..., np.newaxis]
+
+    def _allocate_buffers(self, max_faces: int):
+        """
+        (Re)allocate the reusable preprocessing buffers.
+
+        Batches returned by _preprocess() are views into these buffers and
+        are only valid until the next call.
+        """
+        self._crop_buf = np.empty((max_faces, 48, 48, 3), dtype=np.uint8)
+        self._input_buf = np.empty((max_faces, 48, 48), dtype=np.float32)
+
+    def _infer(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run the emotion CNN on a preprocessed batch.
+
+        Args:
+            batch: Output of _preprocess()
+
+        Returns:
+            (N, 7) float32 emotion percentages in config.EMOTION_LABELS order
+        """
+        probs = np.asarray(self._predict(batch), dtype=np.float32)
+        if self._int8_candidate is not None:
+            self._calibrate_int8(batch, probs)
+        probs *= 100.0 / probs.sum(axis=1, keepdims=True)
+        return probs
+
+    def _calibrate_int8(self, batch: np.ndarray, probs: np.ndarray):
+        """
+        Collect real FP32 predictions and decide on the INT8 candidate.
+
+        Once config.QUANTIZATION_CALIBRATION_FACES faces have been seen, the
+        INT8 model is run on the same inputs and swapped in only if the mean
+        KL(FP32 || INT8) is within config.QUANTIZATION_MAX_KL.
+
+        Args:
+            batch: Preprocessed faces just inferred with the FP32 model
+            probs: FP32 softmax output for batch
+        """
+        # batch is a view into a reused buffer; keep a copy
+        self._calibration.append((batch.copy(), probs.astype(np.float64)))
+        self._calibration_faces += batch.shape[0]
+        if self._calibration_faces < config.QUANTIZATION_CALIBRATION_FACES:
+            return
+
+        candidate = self._int8_candidate
+        inputs = np.concatenate([b for b, _ in self._calibration])
+        p = np.concatenate([q for _, q in self._calibration]) + 1e-7
+        self._int8_candidate = None
+        self._calibration = []
+
+        try:
+            q = np.asarray(candidate(inputs), dtype=np.float64) + 1e-7
+        except Exception as e:
+            print(f"INT8 quantization unavailable, using FP32: {e}")
+            return
+        kl = float(np.mean(np.sum(p * np.log(p / q), axis=1)))
+
+        if kl > config.QUANTIZATION_MAX_KL:
+            print(f"INT8 emotion model rejected (KL={kl:.4f}), using FP32")
+            return
+
+        self._predict = candidate
+        self.quantized = True
+        print(f"INT8 emotion model enabled (KL={kl:.4f} on {inputs.shape[0]} faces)")
+
+    def _face_keys(self, batch: np.ndarray) -> List[bytes]:
+        """
+        Compute a perceptual cache key per face.
+
+        A 16x16 average-hash of the preprocessed face, digested so the
+        key itself carries no recoverable image data.
+
+        Args:
+            batch: Output of _preprocess()
+
+        Returns:
+            One 16-byte key per face
+        """
+        n = batch.shape[0]
+        thumbs = batch.reshape(n, 16, 3, 16, 3).mean(axis=(2, 4))
+        bits = thumbs > thumbs.mean(axis=(1, 2), keepdims=True)
+        packed = np.packbits(bits.reshape(n, -1), axis=1)
+        return [
+            hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+            for row in packed
+        ]
+
+    def _infer_cached(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Run _infer(), reusing recent results for unchanged faces.
+
+        Audience members hold an expression across many consecutive frames,
+        so a face whose thumbnail hash was seen within EMOTION_CACHE_TTL_MS
+        reuses that result. Duplicates within the batch are inferred once.
+
+        Args:
+            batch: Output of _preprocess()
+
+        Returns:
+            (N, 7) float32 emotion percentages
+        """
+        if config.EMOTION_CACHE_SIZE <= 0:
+            return self._infer(batch)
+
+        now = time.monotonic()
+        ttl = config.EMOTION_CACHE_TTL_MS / 1000.0
+        scores = np.empty((batch.shape[0], len(config.EMOTION_LABELS)), dtype=np.float32)
+
+        # key -> batch rows that need it
+        misses = OrderedDict()
+        for i, key in enumerate(self._face_keys(batch)):
+            hit = self._cache.get(key)
+            if hit is not None and now - hit[1] <= ttl:
+                scores[i] = hit[0]
+                self._cache.move_to_end(key)
+            else:
+                misses.setdefault(key, []).append(i)
+
+        if misses:
+            first_rows = [rows[0] for rows in misses.values()]
+            fresh = self._infer(batch[first_rows])
+            for (key, rows), row_scores in zip(misses.items(), fresh):
+                scores[rows] = row_scores
+                self._cache[key] = (row_scores, now)
+                self._cache.move_to_end(key)
+
+            while len(self._cache) > config.EMOTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return scores
+
     def analyze_face(self, face_image: np.ndarray) -> Optional[Dict]:
         """
         Analyze a single face image for emotions.
@@ -76,53 +399,65 @@ class EmotionAnalyzer:
             }
         """
         try:
-            # Ensure face image is valid
-            if face_image is None or face_image.size == 0:
+            # Ensure face image is valid (shape only, no data access)
+            if face_image is None:
+                return None
+            h, w = face_image.shape[:2]
+            if h == 0 or w == 0:
                 return None
 
-            # Resize if too small (DeepFace requires minimum size)
-            if face_image.shape[0] < 48 or face_image.shape[1] < 48:
-                face_image = cv2.resize(face_image, (48, 48))
+            # Crops already at model size go in as a 1-face batch view
+            if face_image.shape == (48, 48, 3) and face_image.dtype == np.uint8:
+                batch = self._preprocess(face_image[np.newaxis])
+            else:
+                batch = self._preprocess([face_image])
 
             # Run emotion analysis
-            result = DeepFace.analyze(
-                face_image,
-                actions=['emotion'],
-                detector_backend='skip',  # We already detected faces
-                enforce_detection=False,
-                silent=True
-            )
-
-            # Handle result format (DeepFace may return list or dict)
-            if isinstance(result, list):
-                result = result[0]
+            scores = self._infer_cached(batch)[0]
 
             self.analysis_count += 1
 
             return {
-                'dominant_emotion': result['dominant_emotion'],
-                'emotion_scores': result['emotion']
+                'dominant_emotion': config.EMOTION_LABELS[int(scores.argmax())],
+                'emotion_scores': dict(zip(config.EMOTION_LABELS, scores.tolist()))
             }
 
         except Exception as e:
             # Silently handle analysis failures (poor lighting, extreme angles, etc.)
             return None
 
-    def analyze_batch(self, face_images: List[np.ndarray]) -> List[Optional[Dict]]:
+    def analyze_batch(
+        self,
+        face_images: Union[List[np.ndarray], np.ndarray]
+    ) -> EmotionBatch:
         """
-        Analyze multiple faces in sequence.
+        Analyze multiple faces with a single batched model call.
 
         Args:
-            face_images: List of cropped face regions
+            face_images: List of cropped face regions, or an (N, 48, 48, 3)
+                batch from CinemaFaceDetector.extract_face_batch()
 
         Returns:
-            List of emotion analysis results (same order as input)
+            EmotionBatch with one row per valid face crop
         """
-        results = []
-        for face_img in face_images:
-            result = self.analyze_face(face_img)
-            results.append(result)
-        return results
+        if isinstance(face_images, np.ndarray):
+            valid_faces = face_images
+        else:
+            valid_faces = [
+                face_img for face_img in face_images
+                if face_img is not None and face_img.size > 0
+            ]
+        if len(valid_faces) == 0:
+            return EmotionBatch.empty()
+
+        try:
+            scores = self._infer_cached(self._preprocess(valid_faces))
+        except Exception:
+            # Same failure policy as analyze_face: drop the frame's faces
+            return EmotionBatch.empty()
+
+        self.analysis_count += len(valid_faces)
+        return EmotionBatch.from_scores(scores)
 
     def get_shock_relevant_score(self, emotion_result: Dict) -> float:
         """
@@ -140,25 +475,37 @@ class EmotionAnalyzer:
             return 0.0
 
         scores = emotion_result['emotion_scores']
-
-        # Weighted combination of emotions
-        shock_score = (
-            scores.get('fear', 0) * config.FEAR_WEIGHT +
-            scores.get('surprise', 0) * config.SURPRISE_WEIGHT +
-            scores.get('disgust', 0) * config.DISGUST_WEIGHT +
-            scores.get('happy', 0) * config.HAPPY_WEIGHT +  # Nervous laughter
-            scores.get('angry', 0) * config.ANGRY_WEIGHT +
-            scores.get('sad', 0) * config.SAD_WEIGHT +
-            scores.get('neutral', 0) * config.NEUTRAL_WEIGHT
+        score_vec = np.fromiter(
+            (scores.get(e, 0) for e in config.EMOTION_LABELS),
+            dtype=np.float32,
+            count=len(config.EMOTION_LABELS)
         )
 
-        # Normalize to 0-100 scale
-        max_possible_score = 100 * (
-            config.FEAR_WEIGHT + config.SURPRISE_WEIGHT
-        )
-        normalized_score = min(100, (shock_score / max_possible_score) * 100)
+        # Weighted combination of emotions (happy = nervous laughter),
+        # normalized to 0-100 scale
+        shock_score = float(np.dot(score_vec, config.WEIGHTS))
+        return round(min(100.0, shock_score * _INV_NORM * 100.0), 2)
 
-        return round(normalized_score, 2)
+    def get_shock_relevant_scores_batch(
+        self,
+        scores: Union[EmotionBatch, np.ndarray]
+    ) -> np.ndarray:
+        """
+        Vectorized get_shock_relevant_score for every face in a frame.
+
+        Args:
+            scores: EmotionBatch or (N, 7) array in config.EMOTION_LABELS order
+
+        Returns:
+            (N,) float32 array of shock scores between 0-100
+        """
+        if isinstance(scores, EmotionBatch):
+            scores = scores.scores
+        scores = np.ascontiguousarray(scores, dtype=np.float32)
+        if scores.shape[0] == 0:
+            return np.empty(0, dtype=np.float32)
+
+        return _shock_scores(scores, config.WEIGHTS, _MAX_SHOCK)
 
 
 class EmotionAggregator:
@@ -166,28 +513,112 @@ class EmotionAggregator:
     Aggregates emotion data across multiple faces and time windows.
     """
 
-    def __init__(self):
-        """Initialize aggregator with empty state."""
-        self.emotion_history = []
-        self.timestamp_history = []
+    def __init__(
+        self,
+        initial_capacity: int = 1024,
+        history_seconds: Optional[float] = None
+    ):
+        """
+        Initialize aggregator with empty state.
+
+        Per-frame history is kept as contiguous arrays. A frame's faces
+        only contribute to a window mean through their sum, so each frame
+        stores one (7,) score sum plus its face count. Frames older than
+        history_seconds are compacted away when the buffer fills, so memory
+        stays bounded over arbitrarily long sessions.
+
+        Args:
+            initial_capacity: Frames to preallocate (grows by doubling only
+                if the retained history does not fit)
+            history_seconds: History to retain for get_aggregate_emotions()
+                (defaults to, and is at least, config.EPM_WINDOW_SECONDS)
+        """
+        self.frame_sums = np.zeros(
+            (initial_capacity, len(config.EMOTION_LABELS)),
+            dtype=np.float64
+        )
+        self.face_counts = np.zeros(initial_capacity, dtype=np.int64)
+        self.timestamps = np.zeros(initial_capacity, dtype=np.float64)
+        self.frame_total = 0
+
+        # Incrementally maintained sums for the default EPM window
+        self.window_seconds = config.EPM_WINDOW_SECONDS
+        self._window_start = 0
+        self._running_sum = np.zeros(len(config.EMOTION_LABELS), dtype=np.float64)
+        self._running_count = 0
+        self.history_seconds = max(self.window_seconds, history_seconds or 0)
 
     def add_frame_emotions(
         self,
-        frame_results: List[Optional[Dict]],
+        frame_results: Union[EmotionBatch, List[Optional[Dict]]],
         timestamp: float
     ):
         """
         Store emotion results from a single frame.
 
         Args:
-            frame_results: List of emotion analysis results
+            frame_results: EmotionBatch (or legacy list of emotion results)
             timestamp: Frame timestamp in seconds
+
+        Returns:
+            True if the default-window aggregate changed (faces were added
+            or expired); False means get_aggregate_emotions() would return
+            the same values as before this frame
         """
-        # Filter out None results
-        valid_results = [r for r in frame_results if r is not None]
+        batch = EmotionBatch.coerce(frame_results)
+
+        if self.frame_total == self.timestamps.shape[0]:
+            self._make_room()
+
+        n = self.frame_total
+        self.frame_sums[n] = batch.scores.sum(axis=0, dtype=np.float64)
+        self.face_counts[n] = len(batch)
+        self.timestamps[n] = timestamp
+        self.frame_total = n + 1
+
+        # O(1) amortized: add this frame, subtract frames leaving the window
+        self._window_start, count_delta = _roll_window(
+            self._running_sum,
+            self.frame_sums,
+            self.face_counts,
+            self.timestamps,
+            self._window_start,
+            self.frame_total,
+            timestamp - self.window_seconds
+        )
+        self._running_count += int(count_delta)
+
+        return len(batch) > 0 or count_delta != 0
+
+    def _make_room(self):
+        """
+        Free space in the full history buffer.
 
-        self.emotion_history.append(valid_results)
-        self.timestamp_history.append(timestamp)
+        Frames older than history_seconds are dropped by shifting the
+        retained frames to the front; capacity is doubled only if they
+        would still fill more than half the buffer.
+        """
+        n = self.frame_total
+        cutoff_time = self.timestamps[n - 1] - self.history_seconds
+        drop = min(
+            self._window_start,
+            int(np.searchsorted(self.timestamps[:n], cutoff_time, side='left'))
+        )
+        live = n - drop
+
+        if drop:
+            self.frame_sums[:live] = self.frame_sums[drop:n]
+            self.face_counts[:live] = self.face_counts[drop:n]
+            self.timestamps[:live] = self.timestamps[drop:n]
+            self.frame_total = live
+            self._window_start -= drop
+
+        capacity = self.timestamps.shape[0]
+        if live * 2 > capacity:
+            capacity *= 2
+            self.frame_sums = np.resize(self.frame_sums, (capacity, self.frame_sums.shape[1]))
+            self.face_counts = np.resize(self.face_counts, capacity)
+            self.timestamps = np.resize(self.timestamps, capacity)
 
     def get_aggregate_emotions(
         self,
@@ -197,46 +628,36 @@ class EmotionAggregator:
         Calculate aggregate emotion scores over a time window.
 
         Args:
-            window_seconds: Time window for aggregation
+            window_seconds: Time window for aggregation (limited to the
+                retained history_seconds)
 
         Returns:
-            Dictionary with averaged emotion scores across all faces
+            Dictionary with averaged emotion scores across all faces as a
+            float32 'emotions_vec' in config.EMOTION_LABELS order
         """
-        if not self.emotion_history:
+        n = self.frame_total
+        if n == 0:
             return self._get_empty_aggregate()
 
-        # Get recent frames within time window
-        current_time = self.timestamp_history[-1]
-        cutoff_time = current_time - window_seconds
-
-        # Collect all emotion scores within window
-        all_emotions = []
-        for timestamp, frame_emotions in zip(
-            self.timestamp_history,
-            self.emotion_history
-        ):
-            if timestamp >= cutoff_time:
-                all_emotions.extend(frame_emotions)
-
-        if not all_emotions:
+        if window_seconds == self.window_seconds:
+            # Default window: read the running sums
+            count = self._running_count
+            window_sum = self._running_sum
+        else:
+            # Timestamps are non-decreasing: binary-search the window start
+            cutoff_time = self.timestamps[n - 1] - window_seconds
+            start = int(np.searchsorted(self.timestamps[:n], cutoff_time, side='left'))
+            count = int(self.face_counts[start:n].sum())
+            window_sum = self.frame_sums[start:n].sum(axis=0)
+
+        if count == 0:
             return self._get_empty_aggregate()
 
-        # Calculate average for each emotion
-        emotion_sums = {emotion: 0.0 for emotion in config.EMOTION_LABELS}
-        count = len(all_emotions)
-
-        for emotion_result in all_emotions:
-            for emotion, score in emotion_result['emotion_scores'].items():
-                emotion_sums[emotion] += score
-
         # Average and round
-        emotion_averages = {
-            emotion: round(total / count, 2)
-            for emotion, total in emotion_sums.items()
-        }
+        means = np.round(window_sum / count, 2).astype(np.float32)
 
         return {
-            'emotions': emotion_averages,
+            'emotions_vec': means,
             'sample_size': count,
             'window_seconds': window_seconds
         }
@@ -244,7 +665,7 @@ class EmotionAggregator:
     def _get_empty_aggregate(self) -> Dict:
         """Return empty aggregate structure."""
         return {
-            'emotions': {emotion: 0.0 for emotion in config.EMOTION_LABELS},
+            'emotions_vec': np.zeros(len(config.EMOTION_LABELS), dtype=np.float32),
             'sample_size': 0,
             'window_seconds': 0
         }
@@ -259,25 +680,30 @@ if __name__ == "__main__":
     cap = cv2.VideoCapture(0)
     print("Show different emotions! Press 'q' to quit")
 
+    # Simple face detection for testing (loaded once, run at half resolution)
+    face_cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+    )
+
     while True:
         ret, frame = cap.read()
         if not ret:
             break
 
-        # Simple face detection for testing
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        face_cascade = cv2.CascadeClassifier(
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        )
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-
-        for (x, y, w, h) in faces:
-            face_roi = frame[y:y+h, x:x+w]
-            result = analyzer.analyze_face(face_roi)
-
-            if result:
-                emotion = result['dominant_emotion']
-                shock_score = analyzer.get_shock_relevant_score(result)
+        small = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+        faces = face_cascade.detectMultiScale(small, 1.3, 5)
+        faces = [tuple(box) for box in (np.asarray(faces, dtype=np.int32).reshape(-1, 4) * 2).tolist()]
+
+        # One batched inference + shock pass for all faces in the frame
+        batch = analyzer.analyze_batch([frame[y:y+h, x:x+w] for (x, y, w, h) in faces])
+        shock_scores = analyzer.get_shock_relevant_scores_batch(batch).round(2)
+
+        if len(batch) == len(faces):
+            for (x, y, w, h), dominant, shock_score in zip(
+                faces, batch.dominant.tolist(), shock_scores.tolist()
+            ):
+                emotion = config.EMOTION_LABELS[dominant]
 
                 # Draw results
                 cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
@@ -0,0 +1,98 @@
+"""
+Emotion Batch Container
+
+Structure-of-Arrays representation of per-face emotion scores for a
+single frame. Replaces the list-of-dicts format on the hot path so that
+aggregation is a single NumPy reduction.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from typing import List, Dict, Optional
+import config
+
+
+@dataclass
+class EmotionBatch:
+    """
+    Emotion scores for all faces in a frame.
+
+    Attributes:
+        scores: (N, 7) float32 array, columns ordered as config.EMOTION_LABELS
+        dominant: (N,) uint8 array of label indices into config.EMOTION_LABELS
+    """
+
+    scores: np.ndarray
+    dominant: np.ndarray
+
+    def __len__(self) -> int:
+        return self.scores.shape[0]
+
+    @classmethod
+    def empty(cls) -> 'EmotionBatch':
+        """Return a batch with no faces."""
+        return cls(
+            scores=np.empty((0, len(config.EMOTION_LABELS)), dtype=np.float32),
+            dominant=np.empty(0, dtype=np.uint8)
+        )
+
+    @classmethod
+    def from_scores(cls, scores: np.ndarray) -> 'EmotionBatch':
+        """
+        Build a batch from an (N, 7) score matrix.
+
+        Args:
+            scores: Emotion scores in config.EMOTION_LABELS column order
+
+        Returns:
+            EmotionBatch with dominant labels derived via argmax
+        """
+        scores = np.asarray(scores, dtype=np.float32).reshape(
+            -1, len(config.EMOTION_LABELS)
+        )
+        return cls(
+            scores=scores,
+            dominant=scores.argmax(axis=1).astype(np.uint8)
+        )
+
+    @classmethod
+    def from_results(cls, results: List[Optional[Dict]]) -> 'EmotionBatch':
+        """
+        Convert legacy list-of-dict results (from analyze_face) to a batch.
+
+        Args:
+            results: Emotion dicts with 'emotion_scores'; None entries are dropped
+
+        Returns:
+            EmotionBatch containing only the valid results
+        """
+        valid_results = [r for r in results if r is not None]
+        if not valid_results:
+            return cls.empty()
+
+        scores = np.zeros(
+            (len(valid_results), len(config.EMOTION_LABELS)),
+            dtype=np.float32
+        )
+        for i, result in enumerate(valid_results):
+            for emotion, score in result['emotion_scores'].items():
+                scores[i, config.EMOTION_INDEX[emotion]] = score
+
+        return cls.from_scores(scores)
+
+    @classmethod
+    def coerce(cls, data) -> 'EmotionBatch':
+        """Accept either an EmotionBatch or a legacy list of result dicts."""
+        if isinstance(data, cls):
+            return data
+        return cls.from_results(data)
+
+    def to_results(self) -> List[Dict]:
+        """Expand back into per-face dicts (JSON boundary / legacy callers)."""
+        return [
+            {
+                'dominant_emotion': config.EMOTION_LABELS[d],
+                'emotion_scores': dict(zip(config.EMOTION_LABELS, row))
+            }
+            for d, row in zip(self.dominant.tolist(), self.scores.tolist())
+        ]
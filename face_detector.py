@@ -2,16 +2,132 @@
 Face Detection Module - Optimized for Cinema Environments
 
 Handles face detection in low-light IR camera feeds with multiple audience members.
-Uses MTCNN for robust detection in challenging conditions.
+Uses a single-shot YuNet detector (OpenCV DNN) when its model file is present,
+falling back to MTCNN for robust detection in challenging conditions.
 """
 
+import os
 import cv2
 import numpy as np
+from dataclasses import dataclass
 from mtcnn import MTCNN
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Union, Optional
 import config
 
 
+@dataclass
+class Detections:
+    """
+    Structure-of-Arrays face detections for one frame.
+
+    Attributes:
+        boxes: (N, 4) int32 array of [x, y, width, height]
+        scores: (N,) float32 detection confidences
+        keypoints: (N, 5, 2) int32 landmarks (eyes, nose, mouth corners)
+    """
+
+    boxes: np.ndarray
+    scores: np.ndarray
+    keypoints: np.ndarray
+
+    def __len__(self) -> int:
+        return self.boxes.shape[0]
+
+    def __getitem__(self, index) -> 'Detections':
+        """Select a subset of faces (slice, index array or boolean mask)."""
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 if index != -1 else None)
+        return Detections(
+            self.boxes[index],
+            self.scores[index],
+            self.keypoints[index]
+        )
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise intersection-over-union of two sets of [x, y, w, h] boxes.
+
+    Args:
+        boxes_a: (N, 4) array
+        boxes_b: (M, 4) array
+
+    Returns:
+        (N, M) float32 IoU matrix
+    """
+    a = boxes_a.astype(np.float32)[:, None, :]
+    b = boxes_b.astype(np.float32)[None, :, :]
+
+    inter_w = np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) - np.maximum(a[..., 0], b[..., 0])
+    inter_h = np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) - np.maximum(a[..., 1], b[..., 1])
+    inter = np.clip(inter_w, 0, None) * np.clip(inter_h, 0, None)
+    union = a[..., 2] * a[..., 3] + b[..., 2] * b[..., 3] - inter
+
+    return inter / np.maximum(union, 1e-6)
+
+
+class YuNetFaceDetector:
+    """
+    Single-shot face detector backed by OpenCV's YuNet ONNX model.
+
+    One network pass per frame (vs. MTCNN's three cascaded stages), run
+    through OpenCV DNN on CUDA with FP16 when available. Returns raw
+    detection arrays; CinemaFaceDetector handles filtering.
+    """
+
+    def __init__(self, model_path: str):
+        """
+        Load the YuNet model.
+
+        Args:
+            model_path: Path to the YuNet .onnx file
+        """
+        backend_id = cv2.dnn.DNN_BACKEND_DEFAULT
+        target_id = cv2.dnn.DNN_TARGET_CPU
+        if config.USE_GPU and cv2.cuda.getCudaEnabledDeviceCount() > 0:
+            backend_id = cv2.dnn.DNN_BACKEND_CUDA
+            target_id = cv2.dnn.DNN_TARGET_CUDA_FP16
+
+        self.input_size = (config.FRAME_WIDTH, config.FRAME_HEIGHT)
+        self.detector = cv2.FaceDetectorYN.create(
+            model_path,
+            '',
+            self.input_size,
+            0.6,    # score threshold (final filtering uses DETECTION_CONFIDENCE)
+            0.3,    # NMS threshold
+            5000,   # top-K before NMS
+            backend_id,
+            target_id
+        )
+
+    def detect(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Detect faces in a BGR frame.
+
+        Args:
+            frame: BGR image from OpenCV (numpy array)
+
+        Returns:
+            (boxes (N,4) int32 [x, y, w, h], scores (N,) float32,
+             keypoints (N,5,2) int32)
+        """
+        height, width = frame.shape[:2]
+        if (width, height) != self.input_size:
+            self.input_size = (width, height)
+            self.detector.setInputSize(self.input_size)
+
+        _, faces = self.detector.detect(frame)
+        if faces is None:
+            faces = np.empty((0, 15), dtype=np.float32)
+
+        # Row layout: x, y, w, h, 5 landmark (x, y) pairs, score
+        boxes = faces[:, :4].astype(np.int32)
+        keypoints = faces[:, 4:14].astype(np.int32).reshape(-1, 5, 2)
+        scores = faces[:, 14].astype(np.float32)
+
+        return boxes, scores, keypoints
+
+
 class CinemaFaceDetector:
     """
     High-performance face detector optimized for cinema audience analysis.
@@ -22,110 +138,328 @@ class CinemaFaceDetector:
     - Confidence-based filtering for noisy conditions
     """
 
-    def __init__(self):
-        """Initialize MTCNN detector with cinema-optimized settings."""
-        self.detector = MTCNN(
-            min_face_size=config.MIN_FACE_SIZE,
-            steps_threshold=[0.6, 0.7, config.DETECTION_CONFIDENCE]
-        )
+    # MTCNN landmark names, in keypoint array order
+    KEYPOINT_NAMES = ('left_eye', 'right_eye', 'nose', 'mouth_left', 'mouth_right')
+
+    # Minimum IoU for a new detection to continue a tracked face
+    TRACK_IOU_THRESHOLD = 0.3
+
+    def __init__(self, detect_every_n: Optional[int] = None):
+        """
+        Initialize detector (YuNet if available, else MTCNN) with cinema-optimized settings.
+
+        Args:
+            detect_every_n: Run full detection every N frames and track boxes
+                in between (defaults to config.DETECT_EVERY_N_FRAMES; use 1
+                for unrelated still images)
+        """
+        if os.path.exists(config.YUNET_MODEL_PATH):
+            self.detector = YuNetFaceDetector(config.YUNET_MODEL_PATH)
+            self.backend = 'yunet'
+        else:
+            print(
+                f"YuNet model not found at {config.YUNET_MODEL_PATH}; using MTCNN "
+                "(see INSTALLATION.md to enable the faster detector)"
+            )
+            self.detector = MTCNN(
+                min_face_size=config.MIN_FACE_SIZE,
+                steps_threshold=[0.6, 0.7, config.DETECTION_CONFIDENCE]
+            )
+            self.backend = 'mtcnn'
         self.frame_count = 0
 
-    def detect_faces(self, frame: np.ndarray) -> List[Dict]:
+        # Crop/resize on the GPU when OpenCV has CUDA (see extract_face_batch)
+        self._use_cuda = (
+            config.USE_GPU
+            and hasattr(cv2, 'cuda')
+            and cv2.cuda.getCudaEnabledDeviceCount() > 0
+        )
+        self._gpu_frame = None
+        self._gpu_stream = None
+
+        # Skip-frame tracking state (boxes kept as float for sub-pixel motion)
+        self.detect_every_n = max(1, detect_every_n or config.DETECT_EVERY_N_FRAMES)
+        self._frames_since_detect = 0
+        self._tracks = None
+        self._detected_boxes = None
+        self._track_boxes = None
+        self._track_velocity = None
+
+    def detect_faces(self, frame: np.ndarray) -> Detections:
         """
         Detect all faces in the current frame.
 
         Args:
             frame: BGR image from OpenCV (numpy array)
 
+        Full detection runs every detect_every_n frames. In between, faces
+        from the last detection are carried forward at their estimated
+        velocity with decaying confidence; if any tracked face decays below
+        config.DETECTION_CONFIDENCE, detection is re-run immediately.
+
         Returns:
-            List of face dictionaries with keys:
-                - 'box': [x, y, width, height]
-                - 'confidence': detection confidence score
-                - 'keypoints': facial landmarks (eyes, nose, mouth)
+            Detections with parallel arrays:
+                - boxes: [x, y, width, height] per face
+                - scores: detection confidence per face
+                - keypoints: facial landmarks (eyes, nose, mouth)
         """
         self.frame_count += 1
+        self._frames_since_detect += 1
 
-        # Convert BGR to RGB (MTCNN expects RGB)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self._tracks is not None and self._frames_since_detect < self.detect_every_n:
+            tracked = self._advance_tracks()
+            if tracked is not None:
+                return tracked
 
-        # Detect faces
-        detections = self.detector.detect_faces(rgb_frame)
+        detections = self._detect(frame)
+        self._update_tracks(detections)
+        return detections
 
-        # Filter low-confidence detections
-        filtered_detections = [
-            face for face in detections
-            if face['confidence'] >= config.DETECTION_CONFIDENCE
-        ]
+    def _detect(self, frame: np.ndarray) -> Detections:
+        """Run full detection and apply confidence / max-face filtering."""
+        boxes, scores, keypoints = self._detect_arrays(frame)
 
-        # Limit to max faces (performance optimization)
-        if len(filtered_detections) > config.MAX_FACES_PER_FRAME:
-            # Sort by confidence and take top N
-            filtered_detections = sorted(
-                filtered_detections,
-                key=lambda x: x['confidence'],
-                reverse=True
+        # Filter low-confidence detections
+        keep = np.flatnonzero(scores >= config.DETECTION_CONFIDENCE)
+
+        # Limit to max faces (performance optimization): O(N) partial
+        # selection of the top-N confidences instead of a full sort
+        if keep.size > config.MAX_FACES_PER_FRAME:
+            top = np.argpartition(
+                -scores[keep],
+                config.MAX_FACES_PER_FRAME
             )[:config.MAX_FACES_PER_FRAME]
+            keep = keep[top]
+
+        return Detections(boxes[keep], scores[keep], keypoints[keep])
+
+    def _advance_tracks(self) -> Optional[Detections]:
+        """
+        Move tracked faces one frame forward and decay their confidence.
+
+        Returns:
+            Tracked Detections, or None if any face has decayed below
+            config.DETECTION_CONFIDENCE (caller re-detects)
+        """
+        tracks = self._tracks
+        scores = tracks.scores * config.TRACK_CONFIDENCE_DECAY
+        if scores.size and scores.min() < config.DETECTION_CONFIDENCE:
+            return None
+
+        self._track_boxes += self._track_velocity
+        boxes = np.rint(self._track_boxes).astype(np.int32)
+        shift = boxes[:, :2] - tracks.boxes[:, :2]
+
+        self._tracks = Detections(boxes, scores, tracks.keypoints + shift[:, None, :])
+        return self._tracks
+
+    def _update_tracks(self, detections: Detections):
+        """
+        Replace tracked faces with a fresh detection.
+
+        Each new box is matched to the previous track it overlaps most
+        (IoU >= TRACK_IOU_THRESHOLD) to estimate per-frame velocity;
+        unmatched faces start stationary.
+        """
+        boxes = detections.boxes.astype(np.float32)
+        velocity = np.zeros_like(boxes)
+
+        if self._tracks is not None and len(self._tracks) and len(detections):
+            iou = box_iou(detections.boxes, self._tracks.boxes)
+            best = iou.argmax(axis=1)
+            matched = iou[np.arange(len(best)), best] >= self.TRACK_IOU_THRESHOLD
+            velocity[matched] = (
+                boxes[matched] - self._detected_boxes[best[matched]]
+            ) / self._frames_since_detect
+
+        self._tracks = detections
+        self._detected_boxes = boxes
+        self._track_boxes = boxes.copy()
+        self._track_velocity = velocity
+        self._frames_since_detect = 0
+
+    def _detect_arrays(
+        self,
+        frame: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run the active backend and return raw detection arrays.
 
-        return filtered_detections
+        Args:
+            frame: BGR image
+
+        Returns:
+            (boxes (N,4) int32, scores (N,) float32, keypoints (N,5,2) int32)
+        """
+        if self.backend == 'yunet':
+            return self.detector.detect(frame)
+
+        # MTCNN expects RGB
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        faces = self.detector.detect_faces(rgb_frame)
+
+        n = len(faces)
+        boxes = np.array([f['box'] for f in faces], dtype=np.int32).reshape(n, 4)
+        scores = np.fromiter(
+            (f['confidence'] for f in faces), dtype=np.float32, count=n
+        )
+        keypoints = np.array(
+            [[f['keypoints'][k] for k in self.KEYPOINT_NAMES] for f in faces],
+            dtype=np.int32
+        ).reshape(n, 5, 2)
+
+        return boxes, scores, keypoints
 
     def extract_face_regions(
         self,
         frame: np.ndarray,
-        detections: List[Dict]
+        detections: Union[Detections, np.ndarray]
     ) -> List[np.ndarray]:
         """
         Extract individual face regions from frame for emotion analysis.
 
         Args:
             frame: Full video frame
-            detections: List of face detections from detect_faces()
+            detections: Detections from detect_faces(), or an (N, 4) int
+                array of [x, y, w, h] boxes
 
         Returns:
-            List of cropped face images (BGR format)
+            List of cropped face images (BGR format, zero-copy views)
         """
-        face_regions = []
-        height, width = frame.shape[:2]
+        x1, y1, x2, y2 = self._crop_bounds(frame, detections)
+
+        # Extract face regions (empty ones were dropped by _crop_bounds)
+        return [
+            frame[top:bottom, left:right]
+            for left, top, right, bottom in zip(x1, y1, x2, y2)
+        ]
+
+    def extract_face_batch(
+        self,
+        frame: np.ndarray,
+        detections: Union[Detections, np.ndarray],
+        size: int = 48
+    ) -> np.ndarray:
+        """
+        Crop and resize all faces straight into one model-sized batch.
+
+        With CUDA-enabled OpenCV the frame is uploaded once, each crop is a
+        GpuMat ROI resized on the device into its batch slot, and only the
+        small (N, size, size, 3) batch is downloaded. Otherwise crops are
+        resized on the CPU into the preallocated batch.
+
+        Args:
+            frame: Full video frame
+            detections: Detections from detect_faces(), or an (N, 4) int
+                array of [x, y, w, h] boxes
+            size: Output side length (emotion model input size)
+
+        Returns:
+            (N, size, size, 3) uint8 BGR face batch, empty crops skipped
+        """
+        x1, y1, x2, y2 = self._crop_bounds(frame, detections)
+        n = len(x1)
+        batch = np.empty((n, size, size, 3), dtype=np.uint8)
+        if n == 0:
+            return batch
+
+        if self._use_cuda:
+            try:
+                return self._extract_face_batch_cuda(frame, x1, y1, x2, y2, size)
+            except cv2.error as e:
+                print(f"CUDA face crop failed, using CPU: {e}")
+                self._use_cuda = False
+
+        for i, (left, top, right, bottom) in enumerate(zip(x1, y1, x2, y2)):
+            cv2.resize(
+                frame[top:bottom, left:right],
+                (size, size),
+                dst=batch[i],
+                interpolation=cv2.INTER_AREA if bottom - top > size else cv2.INTER_LINEAR
+            )
+        return batch
+
+    def _extract_face_batch_cuda(self, frame, x1, y1, x2, y2, size) -> np.ndarray:
+        """Device-side crop + resize for extract_face_batch()."""
+        if self._gpu_frame is None:
+            self._gpu_frame = cv2.cuda_GpuMat()
+            self._gpu_stream = cv2.cuda_Stream()
+        stream = self._gpu_stream
+        self._gpu_frame.upload(frame, stream)
+
+        # Faces stacked vertically in one device buffer -> single download
+        n = len(x1)
+        gpu_batch = cv2.cuda_GpuMat(n * size, size, cv2.CV_8UC3)
+        for i in range(n):
+            gpu_crop = self._gpu_frame.rowRange(y1[i], y2[i]).colRange(x1[i], x2[i])
+            cv2.cuda.resize(
+                gpu_crop,
+                (size, size),
+                dst=gpu_batch.rowRange(i * size, (i + 1) * size),
+                interpolation=cv2.INTER_AREA if y2[i] - y1[i] > size else cv2.INTER_LINEAR,
+                stream=stream
+            )
 
-        for detection in detections:
-            x, y, w, h = detection['box']
+        batch = gpu_batch.download(stream)
+        stream.waitForCompletion()
+        return batch.reshape(n, size, size, 3)
 
-            # Add padding around face (10% on each side)
-            padding = int(min(w, h) * 0.1)
-            x1 = max(0, x - padding)
-            y1 = max(0, y - padding)
-            x2 = min(width, x + w + padding)
-            y2 = min(height, y + h + padding)
+    def _crop_bounds(
+        self,
+        frame: np.ndarray,
+        detections: Union[Detections, np.ndarray]
+    ) -> Tuple[List[int], List[int], List[int], List[int]]:
+        """
+        Padded, frame-clamped crop rectangles for non-empty faces.
 
-            # Extract face region
-            face_roi = frame[y1:y2, x1:x2]
+        Returns:
+            (x1, y1, x2, y2) lists of ints
+        """
+        if isinstance(detections, Detections):
+            detections = detections.boxes
+        boxes = detections.astype(np.int32, copy=False).reshape(-1, 4)
 
-            # Ensure face region is valid
-            if face_roi.size > 0:
-                face_regions.append(face_roi)
+        height, width = frame.shape[:2]
+        x, y, w, h = boxes.T
+
+        # Add padding around face (10% on each side), clamped to the frame
+        padding = (np.minimum(w, h) * 0.1).astype(np.int32)
+        x1 = np.maximum(0, x - padding)
+        y1 = np.maximum(0, y - padding)
+        x2 = np.minimum(width, x + w + padding)
+        y2 = np.minimum(height, y + h + padding)
 
-        return face_regions
+        keep = (y2 > y1) & (x2 > x1)
+        return x1[keep].tolist(), y1[keep].tolist(), x2[keep].tolist(), y2[keep].tolist()
 
     def visualize_detections(
         self,
         frame: np.ndarray,
-        detections: List[Dict]
+        detections: Detections,
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Draw bounding boxes on frame for debugging/demo purposes.
 
         Args:
             frame: Original video frame
-            detections: List of face detections
+            detections: Face detections from detect_faces()
+            out: Optional preallocated buffer (same shape as frame) to draw
+                into instead of allocating a copy
 
         Returns:
             Frame with bounding boxes drawn
         """
-        annotated_frame = frame.copy()
-
-        for detection in detections:
-            x, y, w, h = detection['box']
-            confidence = detection['confidence']
-
+        if out is None:
+            annotated_frame = frame.copy()
+        else:
+            annotated_frame = out
+            np.copyto(annotated_frame, frame)
+
+        for (x, y, w, h), confidence in zip(
+            detections.boxes.tolist(),
+            detections.scores.tolist()
+        ):
             # Draw bounding box (green)
             cv2.rectangle(
                 annotated_frame,
@@ -147,16 +481,15 @@ class CinemaFaceDetector:
                 2
             )
 
-            # Draw keypoints (facial landmarks)
-            keypoints = detection['keypoints']
-            for key, point in keypoints.items():
-                cv2.circle(
-                    annotated_frame,
-                    point,
-                    2,
-                    (0, 0, 255),
-                    -1
-                )
+        # Draw keypoints (facial landmarks) for all faces
+        for point in detections.keypoints.reshape(-1, 2).tolist():
+            cv2.circle(
+                annotated_frame,
+                tuple(point),
+                2,
+                (0, 0, 255),
+                -1
+            )
 
         # Add frame info
         info_text = f"Faces: {len(detections)} | Frame: {self.frame_count}"
@@ -6,10 +6,61 @@ based on real-time audience emotional responses.
 """
 
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from collections import deque
 import config
 
+# Label lookup table for vectorized argmax -> emotion name
+_EMOTION_LABELS = np.array(config.EMOTION_LABELS)
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _scan_sustained(scores, threshold, min_len):
+        """
+        Find closed runs of scores above threshold lasting min_len+ samples.
+
+        Returns:
+            (start_indices, lengths) int64 arrays
+        """
+        n = scores.shape[0]
+        starts = np.empty(n, dtype=np.int64)
+        lengths = np.empty(n, dtype=np.int64)
+        found = 0
+        cur_start = -1
+        for i in range(n):
+            if scores[i] > threshold:
+                if cur_start < 0:
+                    cur_start = i
+            elif cur_start >= 0:
+                if i - cur_start >= min_len:
+                    starts[found] = cur_start
+                    lengths[found] = i - cur_start
+                    found += 1
+                cur_start = -1
+        return starts[:found], lengths[:found]
+else:
+    def _scan_sustained(scores, threshold, min_len):
+        """NumPy fallback when numba is not installed."""
+        above = np.empty(scores.shape[0] + 1, dtype=np.int8)
+        above[0] = 0
+        np.greater(scores, threshold, out=above[1:])
+        edges = np.diff(above)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+
+        # A run still open at the end of the timeline is not counted
+        starts = starts[:ends.shape[0]]
+        lengths = ends - starts
+        keep = lengths >= min_len
+        return starts[keep], lengths[keep]
+
 
 class ShockScoreCalculator:
     """
@@ -27,35 +78,138 @@ class ShockScoreCalculator:
         self.baseline_fear = 0.0
         self.baseline_surprise = 0.0
         self.baseline_established = False
-        self.calibration_data = []
+        self._baseline_fear_sum = 0.0
+        self._baseline_surprise_sum = 0.0
+        self._baseline_count = 0
+
+        # Per-frame constants bound once (avoids module attribute lookups)
+        self._w_fear = float(config.FEAR_WEIGHT)
+        self._w_surprise = float(config.SURPRISE_WEIGHT)
+
+        # Emotion vector columns read by calculate_shock_score_vec()
+        self._shock_columns = [
+            config.EMOTION_INDEX['fear'],
+            config.EMOTION_INDEX['surprise'],
+            config.EMOTION_INDEX['disgust']
+        ]
 
+        self.reset()
+
+    def reset(self):
+        """Clear all Shock Score statistics recorded via update() (baseline is kept)."""
         # Rolling window for EPM calculation
         self.epm_window = deque(maxlen=config.EPM_WINDOW_SECONDS * 10)  # Assumes ~10 samples/sec
+        self._window_sum = 0.0
+        self._window_sumsq = 0.0
+
+        # Session-wide running statistics (Welford)
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.running_max_all_time = 0.0
+
+        # Monotonic-decreasing (index, score) deque: front is the window max
+        self._max_dq = deque()
+
+        # Scare detection: latest score vs. the mean of the 3 scores before
+        # the previous one (moving-average change), kept as a rolling sum
+        self._recent = deque(maxlen=5)
+        self._before_sum = 0.0
+        self._before_len = 0
+
+        # Last ~3 seconds of scores for detect_scare_auto()
+        self._auto_window = deque(maxlen=30)
+
+    @property
+    def sample_count(self) -> int:
+        """Number of Shock Scores passed to update()."""
+        return self._count
+
+    @property
+    def running_mean(self) -> float:
+        """Mean of all Shock Scores passed to update()."""
+        return self._mean
+
+    @property
+    def running_std(self) -> float:
+        """Population standard deviation of all Shock Scores passed to update()."""
+        return (self._m2 / self._count) ** 0.5 if self._count else 0.0
+
+    def update(self, score: float):
+        """
+        Record a new Shock Score in O(1).
+
+        Maintains the EPM window sums, session mean/variance and max, and
+        the recent history used by detect_scare_event().
 
-    def calibrate_baseline(self, emotion_data: List[Dict]):
+        Args:
+            score: Latest Shock Score
+        """
+        if len(self.epm_window) == self.epm_window.maxlen:
+            evicted = self.epm_window[0]
+            self._window_sum -= evicted
+            self._window_sumsq -= evicted * evicted
+        self.epm_window.append(score)
+        self._window_sum += score
+        self._window_sumsq += score * score
+
+        self._count += 1
+        delta = score - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (score - self._mean)
+        if self._count == 1 or score > self.running_max_all_time:
+            self.running_max_all_time = score
+
+        max_dq = self._max_dq
+        while max_dq and max_dq[-1][1] <= score:
+            max_dq.pop()
+        max_dq.append((self._count, score))
+        if max_dq[0][0] <= self._count - self.epm_window.maxlen:
+            max_dq.popleft()
+
+        # After the append, recent[-2] becomes part of the before-window
+        # and recent[0] (if the deque is full) falls out of it
+        recent = self._recent
+        if len(recent) >= 2:
+            self._before_sum += recent[-2]
+        if len(recent) == recent.maxlen:
+            self._before_sum -= recent[0]
+        recent.append(score)
+        self._before_len = max(0, len(recent) - 2)
+
+        self._auto_window.append(score)
+
+    def current_max(self) -> float:
+        """Highest Shock Score in the rolling EPM window (O(1))."""
+        return self._max_dq[0][1] if self._max_dq else 0.0
+
+    def update_baseline(self, fear: float, surprise: float, count: int = 1):
         """
-        Establish baseline emotional state from opening scenes.
+        Add opening-scene samples to the baseline emotional state in O(1).
 
         Args:
-            emotion_data: List of aggregate emotion dictionaries
+            fear: Fear score (or the sum of `count` fear scores)
+            surprise: Surprise score (or the sum of `count` surprise scores)
+            count: Number of samples the values represent
         """
-        if len(emotion_data) < 5:
+        self._baseline_fear_sum += fear
+        self._baseline_surprise_sum += surprise
+        self._baseline_count += count
+
+        if self._baseline_count < 5:
             # Need at least 5 samples for meaningful baseline
             return
 
-        fear_values = [d['emotions'].get('fear', 0) for d in emotion_data]
-        surprise_values = [d['emotions'].get('surprise', 0) for d in emotion_data]
-
-        self.baseline_fear = np.mean(fear_values)
-        self.baseline_surprise = np.mean(surprise_values)
+        self.baseline_fear = self._baseline_fear_sum / self._baseline_count
+        self.baseline_surprise = self._baseline_surprise_sum / self._baseline_count
         self.baseline_established = True
 
     def calculate_shock_score(self, emotion_aggregate: Dict) -> float:
         """
         Calculate instantaneous Shock Score for current moment.
 
-        Formula:
-        Shock Score = (Fear_Delta * 2.0) + (Surprise_Delta * 1.5) + Tension_Factor
+        Dict wrapper around the same formula as calculate_shock_score_vec();
+        uses the aggregate's 'emotions_vec' when present.
 
         Args:
             emotion_aggregate: Current aggregate emotion scores
@@ -63,12 +217,42 @@ class ShockScoreCalculator:
         Returns:
             Shock Score (0-100 scale)
         """
+        emotions_vec = emotion_aggregate.get('emotions_vec')
+        if emotions_vec is not None:
+            return self.calculate_shock_score_vec(emotions_vec)
+
         emotions = emotion_aggregate.get('emotions', {})
+        return self._shock_score(
+            emotions.get('fear', 0),
+            emotions.get('surprise', 0),
+            emotions.get('disgust', 0)
+        )
+
+    def calculate_shock_score_vec(self, emotions_vec: np.ndarray) -> float:
+        """
+        Calculate instantaneous Shock Score from an emotion vector.
 
-        current_fear = emotions.get('fear', 0)
-        current_surprise = emotions.get('surprise', 0)
-        current_disgust = emotions.get('disgust', 0)
+        Args:
+            emotions_vec: (7,) aggregate scores in config.EMOTION_LABELS order
 
+        Returns:
+            Shock Score (0-100 scale)
+        """
+        # One gather, then plain float arithmetic (numpy dispatch would
+        # cost more than the handful of operations on 3 values)
+        fear, surprise, disgust = emotions_vec[self._shock_columns].tolist()
+        return self._shock_score(fear, surprise, disgust)
+
+    def _shock_score(self, current_fear: float, current_surprise: float, current_disgust: float) -> float:
+        """
+        Shock Score formula.
+
+        Formula:
+        Shock Score = (Fear_Delta * 2.0) + (Surprise_Delta * 1.5) + Tension_Factor
+
+        Returns:
+            Shock Score (0-100 scale)
+        """
         # Calculate deltas from baseline
         if self.baseline_established:
             fear_delta = max(0, current_fear - self.baseline_fear)
@@ -83,8 +267,8 @@ class ShockScoreCalculator:
 
         # Calculate weighted shock score
         shock_score = (
-            fear_delta * config.FEAR_WEIGHT +
-            surprise_delta * config.SURPRISE_WEIGHT +
+            fear_delta * self._w_fear +
+            surprise_delta * self._w_surprise +
             tension_factor * 0.5
         )
 
@@ -95,7 +279,7 @@ class ShockScoreCalculator:
 
     def detect_scare_event(
         self,
-        shock_history: List[float],
+        shock_history: Optional[List[float]] = None,
         threshold: float = 30.0
     ) -> bool:
         """
@@ -104,24 +288,74 @@ class ShockScoreCalculator:
         A scare event is characterized by a rapid spike in Shock Score.
 
         Args:
-            shock_history: Recent Shock Score values (last 2-3 seconds)
+            shock_history: Recent Shock Score values (last 2-3 seconds);
+                defaults to the scores recorded via update() (needs at
+                least 5)
             threshold: Minimum score increase to qualify as scare
 
         Returns:
             True if scare detected
         """
+        if shock_history is None:
+            # Constant time: no slicing, no numpy
+            if self._before_len < 3:
+                return False
+            return self._recent[-1] - self._before_sum / self._before_len >= threshold
+
         if len(shock_history) < 3:
             return False
 
-        # Check for sudden increase
-        recent_avg = np.mean(shock_history[-5:-2]) if len(shock_history) >= 5 else shock_history[0]
+        # Check for sudden increase (3 values: plain arithmetic, no numpy)
+        if len(shock_history) >= 5:
+            a, b, c = shock_history[-5:-2]
+            recent_avg = (a + b + c) / 3.0
+        else:
+            recent_avg = shock_history[0]
         current = shock_history[-1]
 
         spike = current - recent_avg
 
         return spike >= threshold
 
-    def calculate_epm(self, shock_scores: List[float]) -> float:
+    def detect_scare_auto(
+        self,
+        window: Optional[List[float]] = None,
+        alpha: float = 7.0
+    ) -> bool:
+        """
+        Detect a scare without a fixed threshold, using the gaps between
+        sorted scores.
+
+        The window is sorted in descending order and the gaps between
+        neighbours are computed. The latest score counts as a scare when it
+        is the window maximum and its gap to the runner-up exceeds alpha
+        times the mean gap, so the test adapts to each film's score range.
+
+        Args:
+            window: Recent Shock Score values, oldest first; defaults to
+                the last 30 scores recorded via update()
+            alpha: Multiple of the mean gap the top gap must exceed
+
+        Returns:
+            True if scare detected
+        """
+        if window is None:
+            window = self._auto_window
+
+        if len(window) < 3:
+            return False
+
+        scores = np.fromiter(window, dtype=np.float64, count=len(window))
+        ordered = np.sort(scores)[::-1]
+        if scores[-1] < ordered[0]:
+            # Spike must be the newest sample, not an earlier one
+            return False
+
+        gaps = -np.diff(ordered)
+        mean_gap = gaps.mean()
+        return mean_gap > 0 and gaps[0] > alpha * mean_gap
+
+    def calculate_epm(self, shock_scores: Optional[List[float]] = None) -> float:
         """
         Calculate EPM (Emotional Performance Metric) over a time window.
 
@@ -132,24 +366,66 @@ class ShockScoreCalculator:
         EPM = (Average_Shock_Score * Peak_Factor * Consistency_Factor) / 10
 
         Args:
-            shock_scores: List of Shock Score values over time window
+            shock_scores: List of Shock Score values over time window;
+                defaults to the rolling EPM window maintained by update()
 
         Returns:
             EPM score (0-10 scale, where 10 is exceptional horror performance)
         """
+        if shock_scores is None:
+            n = len(self.epm_window)
+            if n == 0:
+                return 0.0
+            avg_shock = self._window_sum / n
+            variance = max(0.0, self._window_sumsq / n - avg_shock * avg_shock)
+            return self._epm(avg_shock, self.current_max(), variance ** 0.5, n)
+
         if not shock_scores:
             return 0.0
 
-        # Average shock intensity
-        avg_shock = np.mean(shock_scores)
+        return self._epm(
+            np.mean(shock_scores),
+            np.max(shock_scores),
+            np.std(shock_scores),
+            len(shock_scores)
+        )
+
+    def calculate_session_epm(self) -> float:
+        """
+        EPM over every score passed to update(), from running statistics.
+
+        Returns:
+            Same value as calculate_epm() on the full score history
+        """
+        if self._count == 0:
+            return 0.0
+
+        return self._epm(
+            self._mean,
+            self.running_max_all_time,
+            self.running_std,
+            self._count
+        )
+
+    @staticmethod
+    def _epm(avg_shock: float, max_shock: float, std_dev: float, n: int) -> float:
+        """
+        EPM from summary statistics.
+
+        Args:
+            avg_shock: Average shock intensity
+            max_shock: Peak Shock Score
+            std_dev: Population standard deviation of Shock Scores
+            n: Number of scores
 
+        Returns:
+            EPM score (0-10 scale)
+        """
         # Peak factor (how high did it get?)
-        max_shock = np.max(shock_scores)
         peak_factor = max_shock / 100  # Normalize to 0-1
 
         # Consistency factor (sustained tension vs. sporadic scares)
-        if len(shock_scores) > 1:
-            std_dev = np.std(shock_scores)
+        if n > 1:
             consistency = 1.0 - min(1.0, std_dev / 50)  # Lower variance = better
         else:
             consistency = 1.0
@@ -165,12 +441,65 @@ class ShockScoreReport:
     Generates comprehensive Shock Score analytics report for film studios.
     """
 
-    def __init__(self):
-        """Initialize report generator."""
-        self.timeline_data = []
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize report generator.
+
+        The timeline is stored column-wise in growable arrays (one row per
+        timestamp, emotion columns in config.EMOTION_LABELS order) and only
+        expanded to dicts when the report is generated.
+
+        Args:
+            initial_capacity: Timeline rows to preallocate (grows by doubling)
+        """
+        self._timestamps = np.empty(initial_capacity, dtype=np.float64)
+        self._shock = np.empty(initial_capacity, dtype=np.float32)
+        self._sample_sizes = np.empty(initial_capacity, dtype=np.int32)
+        self._emotions = np.empty(
+            (initial_capacity, len(config.EMOTION_LABELS)),
+            dtype=np.float32
+        )
+        self._n = 0
+
         self.scare_events = []
         self.calculator = ShockScoreCalculator()
 
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def timeline_data(self) -> List[Dict]:
+        """Timeline expanded to one dict per timestamp (JSON boundary)."""
+        return list(self.iter_timeline())
+
+    def iter_timeline(self, chunk_size: int = 4096):
+        """
+        Yield timeline rows as dicts without materializing the whole list.
+
+        Args:
+            chunk_size: Rows converted from the arrays at a time
+
+        Yields:
+            {'timestamp', 'shock_score', 'emotions', 'sample_size'} dicts
+        """
+        for start in range(0, self._n, chunk_size):
+            end = min(start + chunk_size, self._n)
+            for timestamp, shock, emotion_row, sample_size in zip(
+                self._timestamps[start:end].tolist(),
+                self._shock[start:end].tolist(),
+                self._emotions[start:end].tolist(),
+                self._sample_sizes[start:end].tolist()
+            ):
+                yield {
+                    'timestamp': timestamp,
+                    'shock_score': round(shock, 2),
+                    'emotions': dict(zip(
+                        config.EMOTION_LABELS,
+                        [round(score, 2) for score in emotion_row]
+                    )),
+                    'sample_size': sample_size
+                }
+
     def add_timestamp_data(
         self,
         timestamp: float,
@@ -184,17 +513,26 @@ class ShockScoreReport:
         Args:
             timestamp: Time in seconds from film start
             shock_score: Calculated Shock Score
-            emotion_aggregate: Full emotion breakdown
+            emotion_aggregate: Aggregate with a float32 'emotions_vec' (or a
+                legacy 'emotions' dict)
             is_scare_event: Whether this was a detected scare
         """
-        data_point = {
-            'timestamp': timestamp,
-            'shock_score': shock_score,
-            'emotions': emotion_aggregate['emotions'],
-            'sample_size': emotion_aggregate.get('sample_size', 0)
-        }
+        n = self._n
+        if n == self._timestamps.shape[0]:
+            self._grow()
+
+        emotions_vec = emotion_aggregate.get('emotions_vec')
+        if emotions_vec is None:
+            emotions = emotion_aggregate['emotions']
+            emotions_vec = [emotions.get(e, 0) for e in config.EMOTION_LABELS]
+
+        self._timestamps[n] = timestamp
+        self._shock[n] = shock_score
+        self._sample_sizes[n] = emotion_aggregate.get('sample_size', 0)
+        self._emotions[n] = emotions_vec
+        self._n = n + 1
 
-        self.timeline_data.append(data_point)
+        self.calculator.update(shock_score)
 
         if is_scare_event:
             self.scare_events.append({
@@ -203,125 +541,152 @@ class ShockScoreReport:
                 'type': 'jump_scare'
             })
 
-    def generate_report(self) -> Dict:
+    def _grow(self):
+        """Double timeline capacity."""
+        capacity = self._timestamps.shape[0] * 2
+        self._timestamps = np.resize(self._timestamps, capacity)
+        self._shock = np.resize(self._shock, capacity)
+        self._sample_sizes = np.resize(self._sample_sizes, capacity)
+        self._emotions = np.resize(self._emotions, (capacity, self._emotions.shape[1]))
+
+    @staticmethod
+    def _extreme_indices(values: np.ndarray, k: int, largest: bool) -> np.ndarray:
+        """
+        Indices of the k largest (or smallest) values in O(N).
+
+        Ties are broken by index, matching a stable sort.
+
+        Args:
+            values: 1D array
+            k: Number of indices to return
+            largest: Select the largest values (descending) if True,
+                else the smallest (ascending)
+
+        Returns:
+            Up to k indices, ordered by value
+        """
+        keys = -values if largest else values
+        k = min(k, keys.shape[0])
+        kth = np.partition(keys, k - 1)[k - 1]
+        candidates = np.flatnonzero(keys <= kth)
+        order = np.lexsort((candidates, keys[candidates]))
+        return candidates[order[:k]]
+
+    def generate_report(self, include_timeline: bool = True) -> Dict:
         """
         Generate comprehensive analytics report.
 
+        Args:
+            include_timeline: Include the full per-timestamp 'timeline_data'
+                list (callers writing large reports can stream it from
+                iter_timeline() instead)
+
         Returns:
             Report dictionary with all metrics and recommendations
         """
-        if not self.timeline_data:
-            return self._get_empty_report()
+        n = self._n
+        if n == 0:
+            report = self._get_empty_report()
+            if not include_timeline:
+                del report['timeline_data']
+            return report
 
-        # Extract shock scores
-        shock_scores = [d['shock_score'] for d in self.timeline_data]
+        shock_scores = self._shock[:n]
 
-        # Calculate overall metrics
-        avg_shock = np.mean(shock_scores)
-        max_shock = np.max(shock_scores)
-        overall_epm = self.calculator.calculate_epm(shock_scores)
+        # Calculate overall metrics (running statistics from add_timestamp_data)
+        avg_shock = self.calculator.running_mean
+        max_shock = self.calculator.running_max_all_time
+        overall_epm = self.calculator.calculate_session_epm()
 
         # Identify peak moments (top 5 scariest moments)
-        sorted_moments = sorted(
-            self.timeline_data,
-            key=lambda x: x['shock_score'],
-            reverse=True
-        )[:5]
+        peak_indices = self._extreme_indices(shock_scores, 5, largest=True)
+        peak_emotions = _EMOTION_LABELS[
+            self._emotions[peak_indices].argmax(axis=1)
+        ].tolist()
+        peak_times = self._format_timestamps(self._timestamps[peak_indices])
+        peak_indices = peak_indices.tolist()
 
         # Identify weak moments (potential missed opportunities)
-        weak_moments = sorted(
-            self.timeline_data,
-            key=lambda x: x['shock_score']
-        )[:5]
+        weak_indices = self._extreme_indices(shock_scores, 5, largest=False)
+        weak_times = self._format_timestamps(self._timestamps[weak_indices])
+        weak_indices = weak_indices.tolist()
+
+        scare_times = self._format_timestamps(np.fromiter(
+            (s['timestamp'] for s in self.scare_events),
+            dtype=np.float64,
+            count=len(self.scare_events)
+        ))
 
         # Tension analysis
         tension_periods = self._analyze_tension_patterns(shock_scores)
 
         report = {
             'overall_metrics': {
-                'total_runtime_seconds': self.timeline_data[-1]['timestamp'],
+                'total_runtime_seconds': float(self._timestamps[n - 1]),
                 'average_shock_score': round(avg_shock, 2),
                 'peak_shock_score': round(max_shock, 2),
                 'epm_score': overall_epm,
                 'total_scare_events': len(self.scare_events),
-                'average_audience_size': int(np.mean([
-                    d['sample_size'] for d in self.timeline_data
-                ]))
+                'average_audience_size': int(self._sample_sizes[:n].mean())
             },
             'peak_moments': [
                 {
-                    'timestamp': self._format_timestamp(m['timestamp']),
-                    'shock_score': m['shock_score'],
-                    'dominant_emotion': max(
-                        m['emotions'].items(),
-                        key=lambda x: x[1]
-                    )[0]
+                    'timestamp': timestamp,
+                    'shock_score': round(float(self._shock[i]), 2),
+                    'dominant_emotion': emotion
                 }
-                for m in sorted_moments
+                for i, timestamp, emotion in zip(peak_indices, peak_times, peak_emotions)
             ],
             'scare_events': [
                 {
-                    'timestamp': self._format_timestamp(s['timestamp']),
+                    'timestamp': timestamp,
                     'intensity': s['shock_score']
                 }
-                for s in self.scare_events
+                for s, timestamp in zip(self.scare_events, scare_times)
             ],
             'missed_opportunities': [
                 {
-                    'timestamp': self._format_timestamp(m['timestamp']),
-                    'shock_score': m['shock_score'],
+                    'timestamp': timestamp,
+                    'shock_score': round(float(self._shock[i]), 2),
                     'recommendation': 'Consider enhancing tension in this segment'
                 }
-                for m in weak_moments
-                if m['shock_score'] < 10
+                for i, timestamp in zip(weak_indices, weak_times)
+                if self._shock[i] < 10
             ],
-            'tension_analysis': tension_periods,
-            'timeline_data': self.timeline_data
+            'tension_analysis': tension_periods
         }
+        if include_timeline:
+            report['timeline_data'] = self.timeline_data
 
         return report
 
-    def _analyze_tension_patterns(self, shock_scores: List[float]) -> Dict:
+    def _analyze_tension_patterns(self, shock_scores: np.ndarray) -> Dict:
         """
         Analyze sustained tension periods vs. isolated scares.
 
         Args:
-            shock_scores: Full timeline of Shock Scores
+            shock_scores: Full timeline of Shock Scores (float32 array)
 
         Returns:
             Tension pattern analysis
         """
-        # Find sustained high-tension periods (shock > 20 for 30+ seconds)
-        tension_threshold = 20
-        sustained_periods = []
-
-        current_period_start = None
-        for i, score in enumerate(shock_scores):
-            if score > tension_threshold:
-                if current_period_start is None:
-                    current_period_start = i
-            else:
-                if current_period_start is not None:
-                    period_length = i - current_period_start
-                    if period_length >= 30:  # At least 30 samples (~30 seconds)
-                        sustained_periods.append({
-                            'start_index': current_period_start,
-                            'duration_samples': period_length
-                        })
-                    current_period_start = None
+        # Find sustained high-tension periods (shock > 20 for 30+ seconds,
+        # i.e. at least 30 samples)
+        _, durations = _scan_sustained(shock_scores, 20.0, 30)
 
         return {
-            'sustained_tension_periods': len(sustained_periods),
-            'average_tension_duration': np.mean([
-                p['duration_samples'] for p in sustained_periods
-            ]) if sustained_periods else 0
+            'sustained_tension_periods': len(durations),
+            'average_tension_duration': durations.mean() if len(durations) else 0
         }
 
-    def _format_timestamp(self, seconds: float) -> str:
-        """Convert seconds to MM:SS format."""
-        minutes = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{minutes:02d}:{secs:02d}"
+    def _format_timestamps(self, seconds: np.ndarray) -> List[str]:
+        """Convert an array of seconds to MM:SS strings."""
+        whole_seconds = np.floor(seconds).astype(np.int64)
+        minutes, secs = np.divmod(whole_seconds, 60)
+        return [
+            f"{m:02d}:{s:02d}"
+            for m, s in zip(minutes.tolist(), secs.tolist())
+        ]
 
     def _get_empty_report(self) -> Dict:
         """Return empty report structure."""
@@ -351,7 +716,11 @@ if __name__ == "__main__":
     ]
 
     # Calibrate baseline
-    calculator.calibrate_baseline(test_emotions[:2])
+    for emotions in test_emotions[:2]:
+        calculator.update_baseline(
+            emotions['emotions'].get('fear', 0),
+            emotions['emotions'].get('surprise', 0)
+        )
     print(f"Baseline Fear: {calculator.baseline_fear}")
     print(f"Baseline Surprise: {calculator.baseline_surprise}")
 
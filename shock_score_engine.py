@@ -9,14 +9,31 @@ import cv2
 import numpy as np
 import argparse
 import json
+import queue
+import sys
+import threading
 import time
+from collections import deque
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+
+try:
+    import orjson
+
+    def _dumps(obj, indent: bool = False) -> bytes:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+except ImportError:
+    def _dumps(obj, indent: bool = False) -> bytes:
+        return json.dumps(obj, indent=2 if indent else None, default=float).encode()
 
 # Import custom modules
 import config
 from face_detector import CinemaFaceDetector
 from emotion_analyzer import EmotionAnalyzer, EmotionAggregator
+from emotion_batch import EmotionBatch
 from shock_score_calculator import ShockScoreCalculator, ShockScoreReport
 from anonymizer import DataAnonymizer
 
@@ -50,12 +67,37 @@ class ShockScoreEngine:
         # Processing state
         self.frame_count = 0
         self.processed_count = 0
-        self.shock_history = []
+
+        # Last aggregate/score, reused while no faces enter or leave the window
+        self._last_aggregate = None
+        self._last_shock = 0.0
+        self._baseline_columns = [
+            config.EMOTION_INDEX['fear'], config.EMOTION_INDEX['surprise']
+        ]
         self.realtime_display = realtime_display
         self.start_time = None
 
-        # Performance metrics
-        self.fps_history = []
+        # Performance metrics: last-100 ring buffer with running sum for the
+        # progress display, plus session totals for the report
+        self._fps_ring = np.zeros(100, dtype=np.float32)
+        self._fps_i = 0
+        self._fps_n = 0
+        self._fps_sum = 0.0
+        self._fps_total_sum = 0.0
+        self._fps_total_n = 0
+
+        # Display runs on its own thread; the single-slot queue keeps only
+        # the newest frame so processing never waits on the GUI. HighGUI
+        # only works from the main thread on macOS, so it stays inline there.
+        self._viz_queue = queue.Queue(maxsize=1)
+        self._quit_event = threading.Event()
+        self._viz_thread = None
+        self._viz_error = None
+        self._viz_threaded = sys.platform != 'darwin'
+
+        # Display buffers, reused across frames (see _create_visualization)
+        self._panel = None
+        self._combined = None
 
         print("Engine initialized successfully")
 
@@ -91,8 +133,25 @@ class ShockScoreEngine:
 
         self.start_time = time.time()
 
+        # Frames waiting to be processed together in one batched inference
+        pending = deque()
+
+        # Loop constants hoisted out of the per-frame path
+        frame_skip = config.FRAME_SKIP
+        batch_size = config.FRAME_BATCH_SIZE
+
+        if self.realtime_display:
+            self._start_visualization()
+
         try:
             while True:
+                if self._quit_event.is_set():
+                    if self._viz_error is not None:
+                        print(f"\nDisplay failed, stopping: {self._viz_error}")
+                    else:
+                        print("\nProcessing interrupted by user")
+                    break
+
                 ret, frame = cap.read()
 
                 if not ret:
@@ -101,79 +160,219 @@ class ShockScoreEngine:
 
                 self.frame_count += 1
 
-                # Process frame (with frame skipping for performance)
-                if self.frame_count % config.FRAME_SKIP == 0:
-                    timestamp = self.frame_count / fps
-                    annotated_frame = self._process_frame(frame, timestamp)
+                # Queue frame (with frame skipping for performance)
+                if self.frame_count % frame_skip == 0:
+                    pending.append((frame, self.frame_count / fps))
 
-                    # Display if enabled
-                    if self.realtime_display and annotated_frame is not None:
-                        cv2.imshow('Shock Score Engine', annotated_frame)
-
-                        if cv2.waitKey(1) & 0xFF == ord('q'):
-                            print("\nProcessing interrupted by user")
-                            break
+                if len(pending) >= batch_size:
+                    frames, timestamps = zip(*pending)
+                    pending.clear()
+                    self._process_batch(frames, timestamps)
 
                 # Progress indicator
                 if self.frame_count % 100 == 0:
                     self._print_progress(fps, total_frames)
 
+            # Drain the final partial batch
+            if pending:
+                frames, timestamps = zip(*pending)
+                self._process_batch(frames, timestamps)
+
         finally:
             # Cleanup
             cap.release()
             if self.realtime_display:
+                self._stop_visualization()
                 cv2.destroyAllWindows()
 
         # Generate final report
         self._finalize_and_save_report(output_file)
 
-    def _process_frame(self, frame: np.ndarray, timestamp: float) -> Optional[np.ndarray]:
+    def _start_visualization(self):
+        """Start the display thread (or inline display on macOS)."""
+        self._quit_event.clear()
+        self._viz_error = None
+        if not self._viz_threaded:
+            return
+        self._viz_thread = threading.Thread(target=self._viz_loop, daemon=True)
+        self._viz_thread.start()
+
+    def _stop_visualization(self):
+        """Signal the display thread to exit and wait for it."""
+        if self._viz_thread is None:
+            return
+        self._publish_visualization(None)
+        self._viz_thread.join(timeout=2.0)
+        self._viz_thread = None
+
+    def _publish_visualization(self, item):
+        """Hand the newest frame to the display thread, dropping any stale one."""
+        if self._viz_thread is None:
+            if item is not None:
+                self._show_visualization(item)
+            return
+
+        try:
+            self._viz_queue.put_nowait(item)
+        except queue.Full:
+            try:
+                self._viz_queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._viz_queue.put_nowait(item)
+
+    def _viz_loop(self):
+        """
+        Display thread: render and show frames from the queue.
+
+        Pressing 'q' sets the quit event checked by process_video(). A
+        rendering error is stored in _viz_error and also sets the quit
+        event, so processing stops instead of running on without a display.
+        """
+        while True:
+            try:
+                item = self._viz_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            try:
+                self._show_visualization(item)
+            except Exception as e:
+                self._viz_error = e
+                self._quit_event.set()
+                break
+
+    def _show_visualization(self, item):
+        """Render one published frame and poll the keyboard for 'q'."""
+        cv2.imshow('Shock Score Engine', self._create_visualization(*item))
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            self._quit_event.set()
+
+    def _process_frame(self, frame: np.ndarray, timestamp: float):
         """
         Process a single video frame through the FER pipeline.
 
         Args:
             frame: Video frame (BGR format)
             timestamp: Frame timestamp in seconds
+        """
+        self._process_batch([frame], [timestamp])
 
-        Returns:
-            Annotated frame for display (or None if display disabled)
+    def _process_batch(
+        self,
+        frames: List[np.ndarray],
+        timestamps: List[float]
+    ):
+        """
+        Process consecutive video frames with one batched emotion inference.
+
+        Faces from all frames are stacked into a single model call; results
+        are then split back per frame and fed through the (order-dependent)
+        aggregation, Shock Score and report steps frame by frame.
+
+        Args:
+            frames: Video frames (BGR format), in playback order
+            timestamps: Frame timestamps in seconds
         """
-        frame_start_time = time.time()
+        batch_start_time = time.time()
+
+        # Step 1: Detect faces in every frame
+        all_detections = []
+        face_batches = []
+        for frame in frames:
+            detections = self.face_detector.detect_faces(frame)
+            all_detections.append(detections)
+            face_batches.append(self.face_detector.extract_face_batch(frame, detections))
+
+        # Step 2: Analyze emotions for all faces at once
+        face_counts = [len(faces) for faces in face_batches]
+        offsets = np.cumsum([0] + face_counts).tolist()
+        emotion_results = self.emotion_analyzer.analyze_batch(np.concatenate(face_batches))
+        if len(emotion_results) != offsets[-1]:
+            # Inference failed for the batch: treat every frame as faceless
+            offsets = [0] * len(offsets)
+
+        for i, (frame, timestamp, detections) in enumerate(
+            zip(frames, timestamps, all_detections)
+        ):
+            frame_results = EmotionBatch(
+                emotion_results.scores[offsets[i]:offsets[i + 1]],
+                emotion_results.dominant[offsets[i]:offsets[i + 1]]
+            )
+            self._finish_frame(
+                frame,
+                timestamp,
+                detections,
+                frame_results,
+                (i + 1) / max(time.time() - batch_start_time, 1e-9)
+            )
 
-        # Step 1: Detect faces
-        detections = self.face_detector.detect_faces(frame)
-        face_regions = self.face_detector.extract_face_regions(frame, detections)
+    def _finish_frame(
+        self,
+        frame: np.ndarray,
+        timestamp: float,
+        detections,
+        emotion_results: EmotionBatch,
+        current_fps: float
+    ):
+        """
+        Run the per-frame steps after emotion inference.
 
-        # Step 2: Analyze emotions
-        emotion_results = self.emotion_analyzer.analyze_batch(face_regions)
+        Args:
+            frame: Video frame (BGR format)
+            timestamp: Frame timestamp in seconds
+            detections: Face detections for the frame
+            emotion_results: Emotion scores for the frame's faces
+            current_fps: Processing rate so far in the current batch
+        """
+        has_faces = len(emotion_results) > 0
 
         # Step 3: Anonymize (aggregate across all faces)
-        anonymized_data = self.anonymizer.anonymize_emotion_data(
-            emotion_results,
-            timestamp
-        )
+        if has_faces:
+            anonymized_data = self.anonymizer.anonymize_emotion_data(
+                emotion_results,
+                timestamp
+            )
 
         # Step 4: Calculate aggregate emotions
-        self.emotion_aggregator.add_frame_emotions(emotion_results, timestamp)
-        emotion_aggregate = self.emotion_aggregator.get_aggregate_emotions()
+        window_changed = self.emotion_aggregator.add_frame_emotions(
+            emotion_results, timestamp
+        )
+
+        if window_changed or self._last_aggregate is None:
+            emotion_aggregate = self.emotion_aggregator.get_aggregate_emotions()
 
-        # Step 5: Calculate Shock Score
-        if self.processed_count < 30:  # Calibration phase
-            calibration_data = []
-            for result in emotion_results:
-                if result:
-                    calibration_data.append({'emotions': result['emotion_scores']})
-            self.shock_calculator.calibrate_baseline(calibration_data)
+            # Step 5: Calculate Shock Score
+            if self.processed_count < 30 and has_faces:  # Calibration phase
+                fear_sum, surprise_sum = emotion_results.scores[:, self._baseline_columns].sum(
+                    axis=0, dtype=np.float64
+                ).tolist()
+                self.shock_calculator.update_baseline(
+                    fear_sum, surprise_sum, len(emotion_results)
+                )
 
-        shock_score = self.shock_calculator.calculate_shock_score(emotion_aggregate)
-        self.shock_history.append(shock_score)
+            shock_score = self.shock_calculator.calculate_shock_score_vec(
+                emotion_aggregate['emotions_vec']
+            )
+            self._last_aggregate = emotion_aggregate
+            self._last_shock = shock_score
+        else:
+            # Faceless frame with no faces expiring: aggregate and score
+            # are unchanged, skip recomputing them
+            emotion_aggregate = self._last_aggregate
+            shock_score = self._last_shock
+
+        self.shock_calculator.update(shock_score)
 
         # Step 6: Detect scare events
         is_scare = False
-        if len(self.shock_history) >= 5:
-            is_scare = self.shock_calculator.detect_scare_event(
-                self.shock_history[-10:]
-            )
+        if self.shock_calculator.sample_count >= 5:
+            if config.AUTO_SCARE_DETECTION:
+                is_scare = self.shock_calculator.detect_scare_auto()
+            else:
+                is_scare = self.shock_calculator.detect_scare_event()
 
         # Step 7: Add to report
         self.report_generator.add_timestamp_data(
@@ -185,24 +384,19 @@ class ShockScoreEngine:
 
         self.processed_count += 1
 
-        # Calculate FPS
-        frame_time = time.time() - frame_start_time
-        current_fps = 1.0 / frame_time if frame_time > 0 else 0
-        self.fps_history.append(current_fps)
+        # Record FPS (amortized over the batch)
+        self._record_fps(current_fps)
 
-        # Visualize (if enabled)
+        # Visualize (if enabled) on the display thread
         if self.realtime_display:
-            annotated = self._create_visualization(
+            self._publish_visualization((
                 frame,
                 detections,
                 emotion_aggregate,
                 shock_score,
                 is_scare,
                 current_fps
-            )
-            return annotated
-
-        return None
+            ))
 
     def _create_visualization(
         self,
@@ -227,12 +421,21 @@ class ShockScoreEngine:
         Returns:
             Annotated frame
         """
-        # Draw face detections
-        vis_frame = self.face_detector.visualize_detections(frame, detections)
+        # Reuse the combined frame + panel buffers unless the frame size changed
+        panel_height = 200
+        height, width = frame.shape[:2]
+        if self._combined is None or self._combined.shape != (height + panel_height, width, 3):
+            self._combined = np.empty((height + panel_height, width, 3), dtype=np.uint8)
+            self._panel = self._combined[height:]
+
+        # Draw face detections straight into the top of the combined frame
+        vis_frame = self.face_detector.visualize_detections(
+            frame, detections, out=self._combined[:height]
+        )
 
         # Create info panel
-        panel_height = 200
-        panel = np.zeros((panel_height, vis_frame.shape[1], 3), dtype=np.uint8)
+        panel = self._panel
+        panel.fill(0)
 
         # Shock Score (large display)
         shock_text = f"SHOCK SCORE: {shock_score:.1f}"
@@ -240,7 +443,7 @@ class ShockScoreEngine:
             panel,
             shock_text,
             (20, 50),
-            cv2.FONT_HERSHEY_BOLD,
+            cv2.FONT_HERSHEY_DUPLEX,
             1.2,
             (0, 0, 255) if is_scare else (255, 255, 255),
             3
@@ -252,21 +455,18 @@ class ShockScoreEngine:
                 panel,
                 "*** SCARE DETECTED ***",
                 (20, 90),
-                cv2.FONT_HERSHEY_BOLD,
+                cv2.FONT_HERSHEY_DUPLEX,
                 0.8,
                 (0, 0, 255),
                 2
             )
 
         # Emotion breakdown
-        emotions = emotion_aggregate.get('emotions', {})
+        emotions_vec = emotion_aggregate['emotions_vec']
+        top3 = np.argsort(-emotions_vec, kind='stable')[:3]  # Top 3 emotions
         y_offset = 120
-        for i, (emotion, score) in enumerate(sorted(
-            emotions.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:3]):  # Top 3 emotions
-            text = f"{emotion.upper()}: {score:.1f}%"
+        for i, (idx, score) in enumerate(zip(top3.tolist(), emotions_vec[top3].tolist())):
+            text = f"{config.EMOTION_LABELS[idx].upper()}: {score:.1f}%"
             cv2.putText(
                 panel,
                 text,
@@ -289,16 +489,24 @@ class ShockScoreEngine:
             1
         )
 
-        # Combine frame and panel
-        combined = np.vstack([vis_frame, panel])
+        # Frame and panel already share the combined buffer
+        return self._combined
+
+    def _record_fps(self, current_fps: float):
+        """Add a sample to the FPS ring buffer and session totals in O(1)."""
+        self._fps_sum += current_fps - float(self._fps_ring[self._fps_i])
+        self._fps_ring[self._fps_i] = current_fps
+        self._fps_i = (self._fps_i + 1) % self._fps_ring.shape[0]
+        self._fps_n = min(self._fps_n + 1, self._fps_ring.shape[0])
 
-        return combined
+        self._fps_total_sum += current_fps
+        self._fps_total_n += 1
 
     def _print_progress(self, fps: float, total_frames: int):
         """Print processing progress."""
         if total_frames > 0:
             progress = (self.frame_count / total_frames) * 100
-            avg_fps = np.mean(self.fps_history[-100:]) if self.fps_history else 0
+            avg_fps = self._fps_sum / self._fps_n if self._fps_n else 0
             print(f"Progress: {progress:.1f}% | Processing FPS: {avg_fps:.1f}")
 
     def _finalize_and_save_report(self, output_file: str):
@@ -310,12 +518,12 @@ class ShockScoreEngine:
         """
         print("\nGenerating final report...")
 
-        # Generate comprehensive report
-        report = self.report_generator.generate_report()
+        # Generate comprehensive report (timeline is streamed below)
+        report = self.report_generator.generate_report(include_timeline=False)
 
         # Add processing metadata
         total_time = time.time() - self.start_time if self.start_time else 0
-        avg_fps = np.mean(self.fps_history) if self.fps_history else 0
+        avg_fps = self._fps_total_sum / self._fps_total_n if self._fps_total_n else 0
 
         report['processing_metadata'] = {
             'total_frames': self.frame_count,
@@ -329,9 +537,18 @@ class ShockScoreEngine:
         # Add privacy report
         report['privacy_compliance'] = self.anonymizer.generate_privacy_report()
 
-        # Save to file
-        with open(output_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        # Save to file: summary sections pretty-printed, then the (large)
+        # timeline written one compact row per line as it is generated
+        with open(output_file, 'wb') as f:
+            head = _dumps(report, indent=True).rstrip()
+            f.write(head[:-1].rstrip())
+            f.write(b',\n  "timeline_data": [')
+            separator = b'\n    '
+            for row in self.report_generator.iter_timeline():
+                f.write(separator)
+                f.write(_dumps(row))
+                separator = b',\n    '
+            f.write(b'\n  ]\n}\n')
 
         print(f"\nReport saved to: {output_file}")
 
@@ -10,6 +10,10 @@ from emotion_analyzer import EmotionAnalyzer
 from shock_score_calculator import ShockScoreCalculator
 from anonymizer import DataAnonymizer
 
+# Seeded test face (48x48 RGB) so repeat runs see identical pixels
+_RNG = np.random.default_rng(0)
+_TEST_FACE = _RNG.integers(100, 200, (48, 48, 3), dtype=np.uint8)
+
 print("="*60)
 print("SHOCK SCORE - SIMPLE COMPONENT TEST (WSL2 Compatible)")
 print("="*60)
@@ -42,10 +46,7 @@ print("\n3. Testing Emotion Analyzer...")
 try:
     analyzer = EmotionAnalyzer()
 
-    # Create a proper test face image (48x48 RGB)
-    test_face = np.random.randint(100, 200, (48, 48, 3), dtype=np.uint8)
-
-    result = analyzer.analyze_face(test_face)
+    result = analyzer.analyze_face(_TEST_FACE)
     if result:
         print(f"  ✓ Emotion analyzer working")
         print(f"    Dominant emotion: {result['dominant_emotion']}")